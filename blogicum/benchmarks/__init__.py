@@ -0,0 +1,88 @@
+"""Бенчмарки Блогикума.
+
+Каждый модуль пакета описывает один сценарий и предоставляет функцию
+run(**options), возвращающую словарь с результатами. Запуск:
+
+    python manage.py benchmark <сценарий>
+"""
+import platform
+import statistics
+from contextlib import contextmanager
+from time import perf_counter
+
+import django
+
+from django.db import connection
+
+
+@contextmanager
+def isolated_database():
+    """Временная база с применёнными миграциями, как у тестов Django."""
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def timeit(func, iterations):
+    """Время каждого из iterations вызовов func, в миллисекундах."""
+    timings = []
+    for _ in range(iterations):
+        start = perf_counter()
+        func()
+        timings.append((perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings):
+    """Медиана, 99-й перцентиль и пропускная способность по замерам, мс."""
+    mean = statistics.fmean(timings)
+    return {
+        'requests': len(timings),
+        'p50_ms': round(statistics.median(timings), 3),
+        'p99_ms': round(
+            statistics.quantiles(timings, n=100, method='inclusive')[98], 3
+        ),
+        'mean_ms': round(mean, 3),
+        'rps': round(1000 / mean, 1),
+    }
+
+
+def environment():
+    """Окружение прогона, чтобы отчёты разных машин не путались."""
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'database_version': '.'.join(
+            map(str, connection.Database.sqlite_version_info)
+        ) if connection.vendor == 'sqlite' else None,
+        'machine': platform.machine(),
+    }
+
+
+METRICS = ('rps', 'queries', 'speedup')
+
+
+def compare(report, baseline):
+    """Изменение замеров отчёта относительно прошлого отчёта, в %."""
+    changes = {}
+    for key, value in report.items():
+        old = baseline.get(key) if isinstance(baseline, dict) else None
+        if isinstance(value, dict) and isinstance(old, dict):
+            nested = compare(value, old)
+            if nested:
+                changes[key] = nested
+        elif (
+            (key.endswith('_ms') or key in METRICS)
+            and isinstance(value, (int, float))
+            and not isinstance(value, bool)
+            and isinstance(old, (int, float))
+            and old
+        ):
+            changes[key] = round((value - old) / old * 100, 1)
+    return changes
@@ -0,0 +1,129 @@
+"""Пропускная способность лент и страницы поста: WSGI против ASGI.
+
+Одни и те же страницы запрашиваются concurrency параллельными клиентами:
+синхронные представления — тестовым Client из пула потоков, как под
+WSGI-сервером с потоками, асинхронные (ASYNC_VIEWS) — AsyncClient из
+одного цикла событий, как под ASGI-сервером.
+"""
+import asyncio
+import importlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.db import close_old_connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import clear_url_caches
+
+from . import environment, isolated_database, summarize
+from .data import generate
+from .post_card import DUMMY_CACHES
+from .views import WARMUP, _targets
+
+
+def _reload_urls():
+    import blog.urls
+    import blogicum.urls
+
+    importlib.reload(blog.urls)
+    importlib.reload(blogicum.urls)
+    clear_url_caches()
+
+
+@contextmanager
+def async_views(enabled=True):
+    """Подключает асинхронные или синхронные представления блога."""
+    try:
+        with override_settings(ASYNC_VIEWS=enabled):
+            _reload_urls()
+            yield
+    finally:
+        _reload_urls()
+
+
+def _sync_request(url):
+    client = Client()
+    start = perf_counter()
+    try:
+        response = client.get(url)
+    finally:
+        close_old_connections()
+    return (perf_counter() - start) * 1000, response.status_code
+
+
+def measure_sync(url, iterations, concurrency):
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(_sync_request, [url] * WARMUP))
+        start = perf_counter()
+        results = list(pool.map(_sync_request, [url] * iterations))
+        elapsed = perf_counter() - start
+    return results, elapsed
+
+
+async def _measure_async(url, iterations, concurrency):
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request():
+        async with semaphore:
+            start = perf_counter()
+            response = await client.get(url)
+            return (perf_counter() - start) * 1000, response.status_code
+
+    await asyncio.gather(*(request() for _ in range(WARMUP)))
+    start = perf_counter()
+    results = await asyncio.gather(*(request() for _ in range(iterations)))
+    return results, perf_counter() - start
+
+
+def measure_async(url, iterations, concurrency):
+    return asyncio.run(_measure_async(url, iterations, concurrency))
+
+
+def _report(results, elapsed):
+    timings = [timing for timing, _ in results]
+    return {
+        'status': sorted({status for _, status in results}),
+        **summarize(timings),
+        # Под нагрузкой важна общая пропускная способность, а не 1 / mean.
+        'rps': round(len(results) / elapsed, 1),
+    }
+
+
+def run(iterations=200, seed=0, concurrency=8, **volumes):
+    metrics_logger = logging.getLogger('blog.metrics')
+    report = {
+        'scenario': 'asgi',
+        'environment': environment(),
+        'seed': seed,
+        'iterations': iterations,
+        'concurrency': concurrency,
+    }
+    with isolated_database(), override_settings(
+        ALLOWED_HOSTS=['testserver'],
+        CACHES=DUMMY_CACHES,
+        VIEW_BUDGET_RAISE=False,
+    ):
+        report['volumes'] = generate(seed=seed, **volumes)
+        urls, _ = _targets()
+        metrics_logger.disabled = True
+        try:
+            paths = {}
+            for name, url in urls.items():
+                with async_views(False):
+                    wsgi = _report(*measure_sync(url, iterations, concurrency))
+                with async_views(True):
+                    asgi = _report(
+                        *measure_async(url, iterations, concurrency)
+                    )
+                paths[name] = {
+                    'url': url,
+                    'wsgi': wsgi,
+                    'asgi': asgi,
+                    'speedup': round(asgi['rps'] / wsgi['rps'], 2),
+                }
+            report['paths'] = paths
+        finally:
+            metrics_logger.disabled = False
+    return report
@@ -0,0 +1,131 @@
+"""Генератор тестовых данных заданного объёма.
+
+Объекты создаются через bulk_create без сигналов, поэтому счётчики
+комментариев пересчитываются в конце, а кеш страниц сбрасывается целиком.
+При одинаковом seed получаются одинаковые данные.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from blog.models import Category, Comment, Location, Post
+from blog.query_utils import update_comment_counts
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+PASSWORD = 'benchmark'
+
+VOLUMES = {
+    'users': 50,
+    'categories': 10,
+    'locations': 20,
+    'posts': 2000,
+    'comments': 10000,
+}
+
+
+def _bulk_create(model, objects):
+    """Вставляет объекты пачками и возвращает их уже с первичными ключами.
+
+    SQLite не возвращает ключи из bulk_create, поэтому новые строки
+    перечитываются по ключам больше прежнего наибольшего.
+    """
+    last_pk = model.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first() or 0
+    model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+    return list(model.objects.filter(pk__gt=last_pk).order_by('pk'))
+
+
+def generate(seed=0, **volumes):
+    """Создаёт данные и возвращает число созданных объектов по типам."""
+    volumes = {**VOLUMES, **volumes}
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+    rnd = random.Random(seed)
+    now = timezone.now()
+    # Хеширование пароля медленное, поэтому он общий для всех.
+    password = make_password(PASSWORD)
+    # Номера в именах и slug продолжаются, если база уже не пустая.
+    user_start = User.objects.count()
+    category_start = Category.objects.count()
+
+    with transaction.atomic():
+        users = _bulk_create(
+            User,
+            (
+                User(
+                    username=f'{fake.user_name()}{user_start + i}'[:150],
+                    first_name=fake.first_name(),
+                    last_name=fake.last_name(),
+                    email=fake.email(),
+                    password=password,
+                )
+                for i in range(volumes['users'])
+            ),
+        )
+        categories = _bulk_create(
+            Category,
+            (
+                Category(
+                    title=fake.sentence(nb_words=2)[:256],
+                    description=fake.paragraph(),
+                    slug=f'category-{category_start + i}',
+                    is_published=rnd.random() < 0.9,
+                )
+                for i in range(volumes['categories'])
+            ),
+        )
+        locations = _bulk_create(
+            Location,
+            (
+                Location(name=fake.city()[:256], is_published=True)
+                for _ in range(volumes['locations'])
+            ),
+        )
+        posts = _bulk_create(
+            Post,
+            (
+                Post(
+                    title=fake.sentence(nb_words=5)[:256],
+                    text=fake.text(max_nb_chars=1000),
+                    pub_date=now - timedelta(
+                        minutes=rnd.randrange(60 * 24 * 365)
+                    ),
+                    author=rnd.choice(users),
+                    category=rnd.choice(categories),
+                    location=rnd.choice(locations + [None]),
+                    is_published=rnd.random() < 0.95,
+                )
+                for _ in range(volumes['posts'])
+            ),
+        )
+        comments = _bulk_create(
+            Comment,
+            (
+                Comment(
+                    text=fake.sentence(nb_words=12),
+                    post=rnd.choice(posts),
+                    author=rnd.choice(users),
+                )
+                for _ in range(volumes['comments'])
+            ),
+        )
+        update_comment_counts()
+    cache.clear()
+
+    return {
+        'users': len(users),
+        'categories': len(categories),
+        'locations': len(locations),
+        'posts': len(posts),
+        'comments': len(comments),
+    }
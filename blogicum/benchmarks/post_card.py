@@ -0,0 +1,54 @@
+"""Рендер страницы из десяти карточек с кешем фрагментов и без него."""
+from statistics import median
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.test import override_settings
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+from blog.query_utils import general_request
+
+from . import isolated_database, timeit
+
+DUMMY_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+}
+
+
+def render_page(template, posts):
+    return ''.join(template.render({'post': post}) for post in posts)
+
+
+def run(iterations=200):
+    with isolated_database():
+        category = mixer.blend('blog.Category', is_published=True)
+        location = mixer.blend('blog.Location', is_published=True)
+        mixer.cycle(settings.POSTS_ON_PAGE).blend(
+            'blog.Post',
+            category=category,
+            location=location,
+            is_published=True,
+            pub_date=timezone.now(),
+        )
+        posts = list(general_request()[:settings.POSTS_ON_PAGE])
+        template = get_template('includes/post_card.html')
+
+        with override_settings(CACHES=DUMMY_CACHES):
+            uncached = timeit(
+                lambda: render_page(template, posts), iterations
+            )
+        cache.clear()
+        render_page(template, posts)
+        cached = timeit(lambda: render_page(template, posts), iterations)
+
+    return {
+        'cards': len(posts),
+        'iterations': iterations,
+        'uncached_ms': round(median(uncached), 3),
+        'cached_ms': round(median(cached), 3),
+        'speedup': round(median(uncached) / median(cached), 2),
+    }
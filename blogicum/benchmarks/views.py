@@ -0,0 +1,95 @@
+"""Задержки и пропускная способность основных страниц на больших данных.
+
+Данные создаются генератором benchmarks.data во временной базе, страницы
+запрашиваются тестовым клиентом Django через весь стек middleware. Кеш
+страниц отключён, чтобы замерять работу представлений, а не попадания
+в кеш.
+"""
+import logging
+
+from django.db.models import Count
+from django.test import Client, override_settings
+
+from blog.models import Category, Post
+from blog.query_utils import general_request
+
+from . import environment, isolated_database, summarize, timeit
+from .data import PASSWORD, generate
+from .post_card import DUMMY_CACHES
+
+WARMUP = 5
+
+
+def _targets():
+    posts = general_request()
+    category = Category.objects.filter(is_published=True).annotate(
+        total=Count('posts')
+    ).order_by('-total').first()
+    post = posts.order_by('-comment_count').first()
+    author = Post.objects.values_list(
+        'author__username', flat=True
+    ).annotate(total=Count('pk')).order_by('-total').first()
+    return {
+        'index': '/',
+        'category': f'/category/{category.slug}/',
+        'profile': f'/profile/{author}/',
+        'detail': f'/posts/{post.pk}/',
+    }, post
+
+
+def _queries(response):
+    timing = response.get('Server-Timing', '')
+    if 'queries' not in timing:
+        return None
+    return int(timing.split('desc="')[1].split()[0])
+
+
+def measure(request, iterations):
+    for _ in range(WARMUP):
+        response = request()
+    return {
+        'status': response.status_code,
+        'queries': _queries(response),
+        **summarize(timeit(request, iterations)),
+    }
+
+
+def run(iterations=100, seed=0, **volumes):
+    metrics_logger = logging.getLogger('blog.metrics')
+    report = {
+        'scenario': 'views',
+        'environment': environment(),
+        'seed': seed,
+        'iterations': iterations,
+    }
+    with isolated_database(), override_settings(
+        ALLOWED_HOSTS=['testserver'],
+        CACHES=DUMMY_CACHES,
+        VIEW_BUDGET_RAISE=False,
+    ):
+        report['volumes'] = generate(seed=seed, **volumes)
+        urls, post = _targets()
+        client = Client()
+        author = Client()
+        author.login(username=post.author.username, password=PASSWORD)
+        metrics_logger.disabled = True
+        try:
+            report['paths'] = {
+                name: {'url': url, **measure(
+                    lambda url=url: client.get(url), iterations
+                )}
+                for name, url in urls.items()
+            }
+            comment_url = f'/posts/{post.pk}/comments/'
+            report['paths']['comment'] = {
+                'url': comment_url,
+                **measure(
+                    lambda: author.post(
+                        comment_url, {'text': 'Комментарий бенчмарка'}
+                    ),
+                    iterations,
+                ),
+            }
+        finally:
+            metrics_logger.disabled = False
+    return report
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Category, Comment, Location, Post
+from .search import search_posts
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -11,7 +12,8 @@ class PostAdmin(admin.ModelAdmin):
         'author',
         'location',
         'category',
-        'is_published'
+        'is_published',
+        'comment_count',
     )
     list_editable = (
         'pub_date',
@@ -24,6 +26,12 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('author', 'category', 'location', 'is_published')
     list_display_links = ('title',)
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+
+        return search_posts(queryset, search_term), False
+
 
 admin.site.register(Category)
 admin.site.register(Comment)
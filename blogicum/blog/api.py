@@ -0,0 +1,229 @@
+"""JSON API только для чтения: публикации и комментарии.
+
+Поля ответа выбираются параметром ?fields=id,title,author; из базы
+читаются только нужные столбцы, а связанные таблицы присоединяются,
+только если их поля запрошены. Списки листаются курсором (?cursor=),
+ответы кешируются для анонимов и отдают ETag.
+"""
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+
+from .cache import (
+    INDEX_TAG,
+    add_cache_tags,
+    add_post_tags,
+    cache_anonymous_page,
+    post_tag,
+    user_tag,
+)
+from .conditional import (
+    conditional_view,
+    feed_validators,
+    post_detail_validators,
+)
+from .models import Post
+from .pagination import (
+    COMMENT_ORDERING,
+    CURSOR_PARAM,
+    FEED_ORDERING,
+    CursorPaginator,
+)
+from .query_utils import general_request, visible_posts
+
+FIELDS_PARAM = 'fields'
+
+LIMIT_PARAM = 'limit'
+
+# Поле ответа -> (столбцы для only(), связь для select_related, значение).
+POST_FIELDS = {
+    'id': (('id',), None, lambda post: post.pk),
+    'title': (('title',), None, lambda post: post.title),
+    'text': (('text',), None, lambda post: post.text),
+    'pub_date': (('pub_date',), None, lambda post: post.pub_date),
+    'image': (
+        ('image',), None, lambda post: post.image.url if post.image else None
+    ),
+    'comment_count': (
+        ('comment_count',), None, lambda post: post.comment_count
+    ),
+    'author': (
+        ('author__username',), 'author', lambda post: post.author.username
+    ),
+    'category': (
+        ('category__slug', 'category__title'),
+        'category',
+        lambda post: post.category and {
+            'slug': post.category.slug, 'title': post.category.title
+        },
+    ),
+    'location': (
+        ('location__name',),
+        'location',
+        lambda post: post.location and post.location.name,
+    ),
+}
+
+COMMENT_FIELDS = {
+    'id': (('id',), None, lambda comment: comment.pk),
+    'text': (('text',), None, lambda comment: comment.text),
+    'created_at': (
+        ('created_at',), None, lambda comment: comment.created_at
+    ),
+    'author': (
+        ('author__username',),
+        'author',
+        lambda comment: comment.author.username,
+    ),
+}
+
+# Столбцы, нужные всегда: ключи связей для тегов кеша и поля курсора.
+POST_REQUIRED = ('id', 'pub_date', 'author', 'category', 'location')
+
+COMMENT_REQUIRED = ('id', 'created_at', 'author', 'post')
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def requested_fields(request, available):
+    value = request.GET.get(FIELDS_PARAM)
+    if not value:
+        return list(available)
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise InvalidFields(', '.join(unknown))
+    return names
+
+
+def restrict(queryset, fields, available, required):
+    """Оставляет в выборке только столбцы и связи запрошенных полей."""
+    columns = []
+    relations = []
+    for name in fields:
+        field_columns, relation, _ = available[name]
+        columns.extend(field_columns)
+        if relation:
+            relations.append(relation)
+    # Связь без подполя в only() загрузила бы все столбцы её таблицы.
+    columns.extend(name for name in required if name not in relations)
+    return queryset.select_related(None).select_related(
+        *relations
+    ).only(*columns)
+
+
+def serialize(objects, fields, available):
+    return [
+        {name: available[name][2](obj) for name in fields}
+        for obj in objects
+    ]
+
+
+def json_response(data, status=200):
+    return JsonResponse(
+        data,
+        status=status,
+        encoder=DjangoJSONEncoder,
+        json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False},
+    )
+
+
+def page_limit(request):
+    try:
+        limit = int(request.GET.get(LIMIT_PARAM, settings.POSTS_ON_PAGE))
+    except ValueError:
+        limit = settings.POSTS_ON_PAGE
+    return max(1, min(limit, settings.API_MAX_LIMIT))
+
+
+def page_data(page, fields, available):
+    return {
+        'results': serialize(page, fields, available),
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
+
+
+def filtered_posts(request):
+    queryset = Post.objects
+    if request.GET.get('category'):
+        queryset = queryset.filter(category__slug=request.GET['category'])
+    if request.GET.get('author'):
+        queryset = queryset.filter(author__username=request.GET['author'])
+    return general_request(queryset)
+
+
+def posts_validators(request):
+    return feed_validators(request, filtered_posts(request))
+
+
+def bad_fields(error):
+    return json_response(
+        {'error': f'Неизвестные поля: {error}'}, status=400
+    )
+
+
+@cache_anonymous_page
+@conditional_view(posts_validators)
+def post_list(request):
+    try:
+        fields = requested_fields(request, POST_FIELDS)
+    except InvalidFields as error:
+        return bad_fields(error)
+    queryset = restrict(
+        filtered_posts(request), fields, POST_FIELDS, POST_REQUIRED
+    )
+    page = CursorPaginator(
+        queryset, page_limit(request), FEED_ORDERING
+    ).get_page(request.GET.get(CURSOR_PARAM))
+    add_cache_tags(request, INDEX_TAG)
+    add_post_tags(request, page)
+    return json_response(page_data(page, fields, POST_FIELDS))
+
+
+@cache_anonymous_page
+@conditional_view(post_detail_validators)
+def post_detail(request, post_id):
+    try:
+        fields = requested_fields(request, POST_FIELDS)
+    except InvalidFields as error:
+        return bad_fields(error)
+    post = get_object_or_404(
+        restrict(
+            visible_posts(request.user, Post.objects),
+            fields,
+            POST_FIELDS,
+            POST_REQUIRED,
+        ),
+        pk=post_id,
+    )
+    add_post_tags(request, [post])
+    return json_response(serialize([post], fields, POST_FIELDS)[0])
+
+
+@cache_anonymous_page
+@conditional_view(post_detail_validators)
+def comment_list(request, post_id):
+    try:
+        fields = requested_fields(request, COMMENT_FIELDS)
+    except InvalidFields as error:
+        return bad_fields(error)
+    post = get_object_or_404(
+        visible_posts(request.user, Post.objects).select_related(
+            None
+        ).only('id'),
+        pk=post_id,
+    )
+    queryset = restrict(
+        post.comments.all(), fields, COMMENT_FIELDS, COMMENT_REQUIRED
+    )
+    page = CursorPaginator(
+        queryset, page_limit(request), COMMENT_ORDERING
+    ).get_page(request.GET.get(CURSOR_PARAM))
+    add_cache_tags(request, post_tag(post.pk), *(
+        user_tag(comment.author_id) for comment in page
+    ))
+    return json_response(page_data(page, fields, COMMENT_FIELDS))
@@ -0,0 +1,226 @@
+"""Асинхронные варианты лент и страницы поста для работы под ASGI.
+
+ORM Django 3.2 синхронный, поэтому независимые запросы страницы
+(например, категория и посты страницы или пост и его комментарии)
+запускаются одновременно через asyncio.gather в пуле потоков
+sync_to_async(thread_sensitive=False); у каждого потока своё соединение
+с базой. Включаются настройкой ASYNC_VIEWS.
+"""
+import asyncio
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections
+from django.shortcuts import get_object_or_404, render
+
+from .cache import (
+    INDEX_TAG,
+    add_cache_tags,
+    add_post_tags,
+    cache_anonymous_page,
+    category_feed_tag,
+    category_tag,
+    user_feed_tag,
+    user_tag,
+)
+from .conditional import (
+    category_validators,
+    conditional_view,
+    index_validators,
+    post_detail_validators,
+    profile_validators,
+)
+from .counting import FeedScope
+from .forms import CommentForm
+from .middleware import query_metrics
+from .models import Category, Comment, Post
+from .pagination import (
+    COMMENT_ORDERING,
+    CursorPaginator,
+    WindowedPage,
+    WindowedPaginator,
+    cursor_pagination,
+    use_cursor,
+)
+from .query_utils import general_request, visible_posts
+from .routers import use_replica
+
+User = get_user_model()
+
+
+def _run_query(func):
+    try:
+        with query_metrics():
+            return func()
+    finally:
+        # Поток из пула не закрывает соединение сам по окончании запроса.
+        close_old_connections()
+
+
+async def db(func, *args, **kwargs):
+    """Выполняет func с запросами к базе в отдельном потоке."""
+    return await sync_to_async(_run_query, thread_sensitive=False)(
+        partial(func, *args, **kwargs)
+    )
+
+
+async def paginate(request, queryset, per_page=None, scope=None):
+    """Страница выборки; число постов и сами записи запрашиваются
+    одновременно.
+
+    scope — FeedScope ленты для кешированного числа постов или задача
+    asyncio, которая его вернёт.
+    """
+    per_page = per_page or settings.POSTS_ON_PAGE
+    if use_cursor(request):
+        if isinstance(scope, asyncio.Future):
+            scope.cancel()
+        return await db(cursor_pagination, request, queryset, per_page)
+
+    try:
+        number = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        number = 1
+    bottom = (number - 1) * per_page
+
+    async def count():
+        paginator = WindowedPaginator(
+            queryset,
+            per_page,
+            scope=await scope if isinstance(scope, asyncio.Future) else scope,
+        )
+        await db(lambda: paginator.count)
+        return paginator
+
+    paginator, object_list = await asyncio.gather(
+        count(), db(list, queryset[bottom:bottom + per_page])
+    )
+    if number > paginator.num_pages:
+        # Как Paginator.get_page(): номер за концом ленты — последняя
+        # страница.
+        number = paginator.num_pages
+        bottom = (number - 1) * per_page
+        object_list = await db(list, queryset[bottom:bottom + per_page])
+    return WindowedPage(object_list, number, paginator)
+
+
+def scope_after(lookup, kind, hidden=True):
+    """Задача с FeedScope ленты объекта, который ищет задача lookup."""
+
+    async def scope():
+        return FeedScope(kind, (await lookup).pk, hidden)
+
+    return asyncio.ensure_future(scope())
+
+
+async def resolve_user(request):
+    """Загружает ленивый request.user, пока это можно сделать синхронно."""
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+async def render_async(request, template_name, context):
+    return await sync_to_async(render)(request, template_name, context)
+
+
+@use_replica
+@cache_anonymous_page
+@conditional_view(index_validators)
+async def index(request):
+    page_obj = await paginate(
+        request, general_request(), scope=FeedScope('index')
+    )
+    add_cache_tags(request, INDEX_TAG)
+    add_post_tags(request, page_obj)
+
+    return await render_async(
+        request, 'blog/index.html', {'page_obj': page_obj}
+    )
+
+
+@use_replica
+@cache_anonymous_page
+@conditional_view(category_validators)
+async def category_posts(request, category_slug):
+    lookup = asyncio.ensure_future(db(
+        get_object_or_404, Category, slug=category_slug, is_published=True
+    ))
+    page_obj = await paginate(
+        request,
+        general_request(Post.objects.filter(category__slug=category_slug)),
+        scope=scope_after(lookup, 'category'),
+    )
+    category = await lookup
+    add_cache_tags(
+        request, category_tag(category.pk), category_feed_tag(category.pk)
+    )
+    add_post_tags(request, page_obj)
+
+    return await render_async(
+        request,
+        'blog/category.html',
+        {'category': category, 'page_obj': page_obj},
+    )
+
+
+@use_replica
+@cache_anonymous_page
+@conditional_view(profile_validators)
+async def profile_user(request, username):
+    user = await resolve_user(request)
+    is_author = user.get_username() == username
+    lookup = asyncio.ensure_future(
+        db(get_object_or_404, User, username=username)
+    )
+    page_obj = await paginate(
+        request,
+        general_request(
+            Post.objects.filter(author__username=username),
+            hidden_post=not is_author,
+        ),
+        scope=scope_after(lookup, 'author', not is_author),
+    )
+    author = await lookup
+    add_cache_tags(request, user_tag(author.pk), user_feed_tag(author.pk))
+    add_post_tags(request, page_obj)
+
+    return await render_async(
+        request,
+        'blog/profile.html',
+        {'profile': author, 'page_obj': page_obj},
+    )
+
+
+@use_replica
+@cache_anonymous_page
+@conditional_view(post_detail_validators)
+async def post_detail(request, post_id):
+    user = await resolve_user(request)
+    comments_paginator = CursorPaginator(
+        Comment.objects.filter(post_id=post_id).select_related('author'),
+        settings.COMMENTS_INLINE_LIMIT,
+        COMMENT_ORDERING,
+    )
+    post, comments = await asyncio.gather(
+        db(
+            get_object_or_404,
+            visible_posts(user, Post.objects).select_related(
+                'location', 'category', 'author'
+            ),
+            pk=post_id,
+        ),
+        db(comments_paginator.page),
+    )
+    add_post_tags(request, [post])
+    add_cache_tags(request, *(
+        user_tag(comment.author_id) for comment in comments
+    ))
+
+    return await render_async(
+        request,
+        'blog/detail.html',
+        {'post': post, 'object': post, 'form': CommentForm(),
+         'comments': comments},
+    )
@@ -0,0 +1,88 @@
+"""Аутентификация с кешем пользователей в памяти процесса.
+
+AuthenticationMiddleware на каждом запросе читает пользователя сессии из
+базы. CachedModelBackend держит последних AUTH_USER_CACHE_SIZE
+пользователей в LRU-кеше процесса как значения полей и на каждый запрос
+собирает новый объект, поэтому изменения объекта в одном запросе не
+попадают в другие.
+
+Запись хранится вместе с версией тега пользователя (blog.cache.user_tag)
+и годится, пока версия в общем кеше та же. Сигналы сохранения и удаления
+пользователя (blog.signals) сбрасывают тег в любом процессе, поэтому
+смена пароля или is_active сразу завершает сессии и в остальных, а база
+на повторных запросах не читается. AUTH_USER_CACHE_TIMEOUT ограничивает
+жизнь записи при изменениях в обход сигналов, например через update().
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+
+from .cache import get_tag_versions, user_tag
+
+
+class UserCache:
+
+    def __init__(self):
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version=None):
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            model, db, values, cached_version, expires = entry
+            if expires < time.monotonic() or (
+                version is not None and cached_version != version
+            ):
+                del self._users[user_id]
+                return None
+            self._users.move_to_end(user_id)
+        return model.from_db(db, None, values)
+
+    def set(self, user, version=None):
+        values = tuple(
+            getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+        )
+        expires = time.monotonic() + settings.AUTH_USER_CACHE_TIMEOUT
+        entry = (type(user), user._state.db, values, version, expires)
+        with self._lock:
+            self._users[user.pk] = entry
+            self._users.move_to_end(user.pk)
+            while len(self._users) > settings.AUTH_USER_CACHE_SIZE:
+                self._users.popitem(last=False)
+
+    def delete(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedModelBackend(ModelBackend):
+
+    def get_user(self, user_id):
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return super().get_user(user_id)
+        # Версия читается до выборки: правка во время неё сменит версию,
+        # и следующий запрос перечитает пользователя.
+        tag = user_tag(user_id)
+        version = get_tag_versions((tag,))[tag]
+        user = user_cache.get(user_id, version)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            user_cache.set(user, version)
+        return user
@@ -0,0 +1,262 @@
+import asyncio
+import hashlib
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+TAG_PREFIX = 'blog:tag:'
+
+PAGE_PREFIX = 'blog:page:'
+
+CACHED_HEADERS = ('ETag', 'Last-Modified')
+
+INDEX_TAG = 'index'
+
+# Сбрасываются при любой правке местоположений и пользователей; нужны
+# валидаторам лент, которые считаются до выборки постов страницы.
+LOCATIONS_TAG = 'locations'
+
+USERS_TAG = 'users'
+
+# Сбрасывается при любой правке комментариев: число комментариев выводится
+# в карточках всех лент.
+COMMENTS_TAG = 'comments'
+
+# Бэкенды, кеш которых не виден другим процессам.
+PROCESS_LOCAL_BACKENDS = ('LocMemCache', 'DummyCache')
+
+# Время начала рендера: запроса (RenderStartedMiddleware) или кешируемой
+# страницы (cache_anonymous_page()).
+_render_started = ContextVar('render_started', default=None)
+
+
+def post_tag(post_id):
+    return f'post:{post_id}'
+
+
+def category_tag(category_id):
+    return f'category:{category_id}'
+
+
+def category_feed_tag(category_id):
+    return f'category-feed:{category_id}'
+
+
+def location_tag(location_id):
+    return f'location:{location_id}'
+
+
+def user_tag(user_id):
+    return f'user:{user_id}'
+
+
+def user_feed_tag(user_id):
+    return f'user-feed:{user_id}'
+
+
+def post_tags(post):
+    """Теги всех объектов, данные которых выводятся в карточке поста."""
+    return {
+        post_tag(post.pk),
+        category_tag(post.category_id),
+        location_tag(post.location_id),
+        user_tag(post.author_id),
+    }
+
+
+def get_tag_versions(tags):
+    """Текущие версии тегов.
+
+    Отсутствующим в кеше назначается новая версия: время начала рендера
+    кешируемой страницы, если он идёт, иначе текущее время.
+    """
+    version = _render_started.get() or time.time_ns()
+    keys = {f'{TAG_PREFIX}{tag}': tag for tag in tags}
+    versions = cache.get_many(keys)
+    missing = {key: version for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def begin_render():
+    return _render_started.set(time.time_ns())
+
+
+def end_render(token):
+    _render_started.reset(token)
+
+
+def changed_since_render(versions):
+    """Сброшен ли какой-то из тегов после начала рендера.
+
+    Тогда данные могли быть выбраны до сброса, и кешировать собранное
+    из них нельзя.
+    """
+    started = _render_started.get()
+    return started is not None and any(
+        version > started for version in versions.values()
+    )
+
+
+def invalidate_tags(*tags):
+    """Сбрасывает все закешированные страницы, помеченные этими тегами."""
+    version = time.time_ns()
+    cache.set_many(
+        {f'{TAG_PREFIX}{tag}': version for tag in tags}, timeout=None
+    )
+
+
+def add_cache_tags(request, *tags):
+    """Помечает ответ тегами, по которым кеш страницы будет сброшен."""
+    if hasattr(request, 'cache_tags'):
+        request.cache_tags.update(tags)
+
+
+def add_post_tags(request, posts):
+    for post in posts:
+        add_cache_tags(request, *post_tags(post))
+
+
+def cache_is_shared():
+    """Видят ли сброс тегов другие процессы (воркеры, команды)."""
+    backend = settings.CACHES['default']['BACKEND']
+    return backend.rsplit('.', 1)[-1] not in PROCESS_LOCAL_BACKENDS
+
+
+def page_cache_timeout():
+    from .scheduling import cap_timeout
+
+    return cap_timeout(settings.PAGE_CACHE_TIMEOUT)
+
+
+def page_cache_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'{PAGE_PREFIX}{path}'
+
+
+def _cacheable(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+    )
+
+
+def _cached_response(request, key):
+    entry = cache.get(key)
+    if not entry or get_tag_versions(entry['tags']) != entry['tags']:
+        return None
+    response = HttpResponse(
+        entry['content'], content_type=entry['content_type']
+    )
+    for header, value in entry['headers'].items():
+        response[header] = value
+    return get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=parse_http_date_safe(response.get('Last-Modified')),
+        response=response,
+    )
+
+
+def _store_response(request, key, response, started):
+    """Кеширует ответ под версиями тегов на момент started.
+
+    Теги известны только после выборки данных, поэтому версии читаются
+    после рендера. Если какой-то тег сброшен позже started, страница
+    могла собраться из данных до сброса и в кеш не попадает.
+    TemplateResponse рендерится здесь же, чтобы теги фрагментов шаблона
+    попали в запись.
+    """
+    if hasattr(response, 'render'):
+        response.render()
+    if (
+        response.streaming
+        or response.status_code != 200
+        or response.cookies
+    ):
+        return
+    versions = get_tag_versions(request.cache_tags)
+    if any(version > started for version in versions.values()):
+        return
+    cache.set(
+        key,
+        {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'headers': {
+                header: response[header]
+                for header in CACHED_HEADERS
+                if response.has_header(header)
+            },
+            'tags': versions,
+        },
+        page_cache_timeout(),
+    )
+
+
+def cache_anonymous_page(view):
+    """Кеширует ответы view для анонимных пользователей.
+
+    Вместе с HTML сохраняются версии тегов, которыми view пометила
+    страницу через add_cache_tags(), на момент начала работы view.
+    Запись считается актуальной, пока ни один из её тегов не был сброшен
+    через invalidate_tags().
+    Подходит и для асинхронных view: работа с кешем тогда выполняется
+    в потоке через sync_to_async.
+    """
+    if asyncio.iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not await sync_to_async(_cacheable)(request):
+                return await view(request, *args, **kwargs)
+
+            key = page_cache_key(request)
+            response = await sync_to_async(_cached_response)(request, key)
+            if response is not None:
+                return response
+
+            started = time.time_ns()
+            request.cache_tags = set()
+            token = _render_started.set(started)
+            try:
+                response = await view(request, *args, **kwargs)
+                await sync_to_async(_store_response)(
+                    request, key, response, started
+                )
+            finally:
+                _render_started.reset(token)
+            return response
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not _cacheable(request):
+            return view(request, *args, **kwargs)
+
+        key = page_cache_key(request)
+        response = _cached_response(request, key)
+        if response is not None:
+            return response
+
+        started = time.time_ns()
+        request.cache_tags = set()
+        token = _render_started.set(started)
+        try:
+            response = view(request, *args, **kwargs)
+            _store_response(request, key, response, started)
+        finally:
+            _render_started.reset(token)
+        return response
+
+    return wrapper
@@ -0,0 +1,175 @@
+"""Валидаторы условных GET-запросов (ETag и Last-Modified).
+
+Валидаторы считаются по версиям тегов кеша (см. blog.cache) и одному
+запросу по индексу, поэтому ответ 304 отдаётся без основной выборки и
+рендеринга шаблонов. Версии тегов одинаковы во всех процессах только
+при общем кеше; с кешем в памяти процесса валидаторы не выдаются.
+"""
+import asyncio
+import hashlib
+from calendar import timegm
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+
+from .cache import (
+    COMMENTS_TAG,
+    INDEX_TAG,
+    LOCATIONS_TAG,
+    USERS_TAG,
+    cache_is_shared,
+    get_tag_versions,
+    post_tags,
+)
+from .models import Post
+from .query_utils import general_request, visible_posts
+
+FEED_TAGS = (INDEX_TAG, COMMENTS_TAG, LOCATIONS_TAG, USERS_TAG)
+
+
+def make_validators(request, values, tags, dates=()):
+    """Валидаторы ответа, зависящего от values и версий тегов.
+
+    Версии тегов — это моменты их последнего сброса, поэтому они же
+    участвуют в вычислении Last-Modified.
+    """
+    if not cache_is_shared():
+        return None, None
+    versions = get_tag_versions(tags)
+    parts = (
+        request.user.pk,
+        request.GET.urlencode(),
+        *values,
+        *sorted(versions.items()),
+    )
+    etag = hashlib.md5(repr(parts).encode()).hexdigest()
+    moments = [date for date in dates if date is not None] + [
+        datetime.fromtimestamp(version / 1e9, tz=dt_timezone.utc)
+        for version in versions.values()
+    ]
+    last_modified = max(moments, default=None)
+    if last_modified is not None:
+        # Отложенные публикации автора не должны давать дату в будущем.
+        last_modified = min(last_modified, timezone.now())
+    return f'"{etag}"', last_modified
+
+
+def _async_condition(view, validators):
+    """То же, что condition(), для асинхронной view."""
+
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        etag, last_modified = await sync_to_async(validators)(
+            request, *args, **kwargs
+        )
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = await view(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD'):
+            if last_modified and not response.has_header('Last-Modified'):
+                response['Last-Modified'] = http_date(last_modified)
+            if etag:
+                response.headers.setdefault('ETag', etag)
+        return response
+
+    return inner
+
+
+def conditional_view(compute):
+    """Декоратор condition() с валидаторами, посчитанными один раз.
+
+    Асинхронную view оборачивает так же, считая валидаторы в потоке.
+    """
+
+    def validators(request, *args, **kwargs):
+        if not hasattr(request, 'validators'):
+            request.validators = compute(request, *args, **kwargs)
+        return request.validators
+
+    sync_condition = condition(
+        etag_func=lambda request, *args, **kwargs: (
+            validators(request, *args, **kwargs)[0]
+        ),
+        last_modified_func=lambda request, *args, **kwargs: (
+            validators(request, *args, **kwargs)[1]
+        ),
+    )
+
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            return _async_condition(view, validators)
+        return sync_condition(view)
+
+    return decorator
+
+
+def feed_validators(request, queryset):
+    """Валидаторы ленты: версии тегов и дата её самого свежего поста.
+
+    Любая правка постов, комментариев, категорий, местоположений и
+    пользователей сбрасывает FEED_TAGS, а отложенный пост, вышедший без
+    события в базе, меняет дату самого свежего поста.
+    """
+    latest = queryset.order_by('-pub_date').values_list(
+        'pub_date', flat=True
+    ).first()
+    return make_validators(request, (latest,), FEED_TAGS, (latest,))
+
+
+def index_validators(request):
+    return feed_validators(request, general_request())
+
+
+def category_validators(request, category_slug):
+    return feed_validators(
+        request,
+        general_request(Post.objects.filter(category__slug=category_slug)),
+    )
+
+
+def profile_validators(request, username):
+    return feed_validators(
+        request,
+        general_request(
+            Post.objects.filter(author__username=username),
+            hidden_post=(username != request.user.get_username()),
+        ),
+    )
+
+
+def public_profile_validators(request, username):
+    return feed_validators(
+        request,
+        general_request(Post.objects.filter(author__username=username)),
+    )
+
+
+def post_detail_validators(request, post_id):
+    post = visible_posts(
+        request.user, Post.objects.filter(pk=post_id)
+    ).select_related(None).order_by().annotate(
+        last_comment=Max('comments__created_at')
+    ).only(
+        'pub_date', 'comment_count', 'category_id', 'location_id',
+        'author_id',
+    ).first()
+    if post is None:
+        return None, None
+
+    # Имена авторов комментариев меняются без события у поста.
+    return make_validators(
+        request,
+        (post.pub_date, post.comment_count, post.last_comment),
+        post_tags(post) | {USERS_TAG},
+        (post.pub_date, post.last_comment),
+    )
@@ -0,0 +1,143 @@
+"""Число постов в лентах для пагинации.
+
+Точное число постов ленты (главной, категории, автора) кешируется под
+версиями её тегов кеша, поэтому сбрасывается теми же сигналами, что и
+страницы ленты. COUNT(*) на SQLite прерывается, если не укладывается в
+COUNT_TIME_BUDGET мс; тогда страница получает приблизительное число —
+последнее точное, если с тех пор теги ленты не сбрасывались, или подсчёт
+не дальше COUNT_APPROXIMATE_LIMIT постов, — а точное досчитывается
+фоновой задачей.
+"""
+import hashlib
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, connections
+
+from jobs.queue import enqueue
+
+from .cache import (
+    INDEX_TAG,
+    category_feed_tag,
+    category_tag,
+    get_tag_versions,
+    user_feed_tag,
+)
+from .models import Post
+from .query_utils import general_request
+from .scheduling import cap_timeout
+
+COUNT_PREFIX = 'blog:count:'
+
+# Сколько инструкций SQLite выполняется между проверками бюджета.
+PROGRESS_STEPS = 1000
+
+
+class FeedScope:
+    """Лента, для которой считается число постов.
+
+    Аргументы kind, pk и hidden сериализуемы, по ним фоновая задача
+    восстанавливает ту же ленту.
+    """
+
+    def __init__(self, kind, pk=None, hidden=True):
+        self.kind = kind
+        self.pk = pk
+        self.hidden = hidden
+        if kind == 'index':
+            posts, self.tags = Post.objects, (INDEX_TAG,)
+        elif kind == 'category':
+            posts = Post.objects.filter(category_id=pk)
+            self.tags = (category_tag(pk), category_feed_tag(pk))
+        elif kind == 'author':
+            posts = Post.objects.filter(author_id=pk)
+            self.tags = (user_feed_tag(pk),)
+        else:
+            raise ValueError(kind)
+        self.queryset = general_request(posts, hidden_post=hidden)
+
+    @property
+    def name(self):
+        return f'{self.kind}:{self.pk}:{int(self.hidden)}'
+
+    def versions(self):
+        return sorted(get_tag_versions(self.tags).items())
+
+    def cache_key(self, versions=None):
+        versions = self.versions() if versions is None else versions
+        digest = hashlib.md5(repr(versions).encode()).hexdigest()
+        return f'{COUNT_PREFIX}{self.name}:{digest}'
+
+    @property
+    def last_key(self):
+        return f'{COUNT_PREFIX}{self.name}:last'
+
+
+def timed_count(queryset, budget_ms):
+    """COUNT(*) выборки или None, если он не уложился в budget_ms."""
+    connection = connections[queryset.db]
+    if budget_ms is None or connection.vendor != 'sqlite':
+        return queryset.count()
+    connection.ensure_connection()
+    deadline = perf_counter() + budget_ms / 1000
+    connection.connection.set_progress_handler(
+        lambda: perf_counter() > deadline, PROGRESS_STEPS
+    )
+    try:
+        return queryset.count()
+    except OperationalError as error:
+        if 'interrupted' not in str(error):
+            raise
+        return None
+    finally:
+        connection.connection.set_progress_handler(None, 0)
+
+
+def approximate_count(scope, versions):
+    # Последнее точное число хранится с версиями тегов, при которых оно
+    # посчитано, и годится, только пока лента не менялась.
+    last = cache.get(scope.last_key)
+    if last is not None and last[1] == versions:
+        return last[0]
+    return scope.queryset.order_by().values('pk')[
+        :settings.COUNT_APPROXIMATE_LIMIT
+    ].count()
+
+
+def store_exact_count(scope, count=None, versions=None):
+    # Версии читаются до подсчёта: изменение во время COUNT(*) сбросит
+    # записанное число.
+    if versions is None:
+        versions = scope.versions()
+    if count is None:
+        count = scope.queryset.count()
+    cache.set(
+        scope.cache_key(versions),
+        (count, False),
+        cap_timeout(settings.COUNT_CACHE_TIMEOUT),
+    )
+    cache.set(scope.last_key, (count, versions), timeout=None)
+    return count
+
+
+def feed_count(scope):
+    """(число постов ленты, приблизительное ли оно)."""
+    from .tasks import refresh_feed_count
+
+    versions = scope.versions()
+    key = scope.cache_key(versions)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    count = timed_count(scope.queryset, settings.COUNT_TIME_BUDGET)
+    if count is not None:
+        return store_exact_count(scope, count, versions), False
+
+    count = approximate_count(scope, versions)
+    cache.set(
+        key, (count, True), cap_timeout(settings.COUNT_APPROXIMATE_TIMEOUT)
+    )
+    if cache.add(f'{key}:queued', True, settings.COUNT_APPROXIMATE_TIMEOUT):
+        enqueue(refresh_feed_count, scope.kind, scope.pk, scope.hidden)
+    return count, True
@@ -0,0 +1,167 @@
+"""Ленты RSS и Atom: все публикации, публикации категории и автора.
+
+Ленты строятся на general_request(), поэтому в них попадают те же посты,
+что и на страницах сайта. Ответы кешируются cache_anonymous_page и
+сбрасываются теми же тегами, что и HTML-ленты.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from .cache import (
+    INDEX_TAG,
+    USERS_TAG,
+    add_cache_tags,
+    cache_anonymous_page,
+    category_feed_tag,
+    category_tag,
+    user_feed_tag,
+    user_tag,
+)
+from .conditional import (
+    category_validators,
+    conditional_view,
+    index_validators,
+    public_profile_validators,
+)
+from .models import Category, Post
+from .query_utils import general_request
+
+User = get_user_model()
+
+DESCRIPTION_WORDS = 60
+
+
+class PostFeed(Feed):
+
+    def __call__(self, request, *args, **kwargs):
+        response = super().__call__(request, *args, **kwargs)
+        # Last-Modified выставит condition() по тем же данным, что и ETag.
+        if response.has_header('Last-Modified'):
+            del response['Last-Modified']
+        return response
+
+    def items(self, obj):
+        return general_request(self.posts(obj))[:settings.FEED_ITEMS]
+
+    def posts(self, obj):
+        return Post.objects
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return Truncator(item.text).words(DESCRIPTION_WORDS)
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return [item.category.title] if item.category else []
+
+
+class IndexFeed(PostFeed):
+    title = 'Блогикум'
+    description = 'Новые публикации'
+
+    def get_object(self, request):
+        add_cache_tags(request, INDEX_TAG, USERS_TAG)
+
+    def link(self):
+        return reverse('blog:index')
+
+
+class CategoryFeed(PostFeed):
+
+    def get_object(self, request, category_slug):
+        category = get_object_or_404(
+            Category, slug=category_slug, is_published=True
+        )
+        add_cache_tags(
+            request,
+            category_tag(category.pk),
+            category_feed_tag(category.pk),
+            USERS_TAG,
+        )
+        return category
+
+    def posts(self, obj):
+        return obj.posts
+
+    def title(self, obj):
+        return f'Блогикум: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('blog:category_posts', args=[obj.slug])
+
+
+class ProfileFeed(PostFeed):
+
+    def get_object(self, request, username):
+        author = get_object_or_404(User, username=username)
+        add_cache_tags(request, user_tag(author.pk), user_feed_tag(author.pk))
+        return author
+
+    def posts(self, obj):
+        return obj.posts
+
+    def title(self, obj):
+        return f'Блогикум: публикации {obj.username}'
+
+    def description(self, obj):
+        name = obj.get_full_name() or obj.username
+        return f'Публикации пользователя {name}'
+
+    def link(self, obj):
+        return reverse('blog:profile', args=[obj.username])
+
+
+class AtomMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class IndexAtomFeed(AtomMixin, IndexFeed):
+    pass
+
+
+class CategoryAtomFeed(AtomMixin, CategoryFeed):
+    pass
+
+
+class ProfileAtomFeed(AtomMixin, ProfileFeed):
+    pass
+
+
+def feed_view(feed, validators):
+    return cache_anonymous_page(conditional_view(validators)(feed))
+
+
+index_rss = feed_view(IndexFeed(), index_validators)
+
+index_atom = feed_view(IndexAtomFeed(), index_validators)
+
+category_rss = feed_view(CategoryFeed(), category_validators)
+
+category_atom = feed_view(
+    CategoryAtomFeed(), category_validators
+)
+
+profile_rss = feed_view(ProfileFeed(), public_profile_validators)
+
+profile_atom = feed_view(ProfileAtomFeed(), public_profile_validators)
@@ -1,7 +1,8 @@
 from django import forms
 from django.contrib.auth import get_user_model
 
-from .models import Comment, Post
+from .exporting import FORMATS
+from .models import Category, Comment, Post
 
 User = get_user_model()
 
@@ -31,3 +32,27 @@ class UserEditForm(forms.ModelForm):
     class Meta:
         model = User
         fields = ('first_name', 'last_name', 'username', 'email')
+
+
+class ExportForm(forms.Form):
+    date_from = forms.DateField(label='С даты', required=False)
+    date_to = forms.DateField(label='По дату', required=False)
+    category = forms.ModelChoiceField(
+        Category.objects,
+        label='Категория',
+        to_field_name='slug',
+        required=False,
+    )
+    format = forms.ChoiceField(
+        label='Формат',
+        choices=[(name, name) for name in FORMATS],
+        required=False,
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get('date_from')
+        date_to = cleaned_data.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise forms.ValidationError('Начало периода позже его конца.')
+        return cleaned_data
@@ -0,0 +1,297 @@
+"""Массовая загрузка постов и комментариев из архива (JSONL или CSV).
+
+Каждая запись — словарь с полем type ('post' или 'comment'). Автор,
+категория и местоположение указываются естественными ключами: username,
+slug и name. Записи читаются потоком и сохраняются через bulk_create
+порциями, каждая порция — в своей транзакции, поэтому сигналы моделей
+не срабатывают, а счётчики комментариев и теги кеша затронутых страниц
+обновляются в конце загрузки.
+"""
+import csv
+import json
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache import (
+    COMMENTS_TAG,
+    INDEX_TAG,
+    category_feed_tag,
+    invalidate_tags,
+    post_tag,
+    user_feed_tag,
+)
+from .models import Category, Comment, Location, Post
+from .query_utils import update_comment_counts
+from .scheduling import reset_next_publication
+
+User = get_user_model()
+
+POST = 'post'
+
+COMMENT = 'comment'
+
+TRUE_VALUES = ('1', 'true', 'yes', 'да')
+
+
+class InvalidRecord(ValueError):
+    """Запись архива, которую нельзя загрузить."""
+
+    def __init__(self, line, message):
+        super().__init__(f'строка {line}: {message}')
+        self.line = line
+
+
+def read_records(file, file_format):
+    """Записи файла по одной вместе с номером строки.
+
+    Вместо нечитаемой записи возвращается исключение InvalidRecord,
+    чтобы загрузка могла пропустить её и продолжить.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(file)
+        for record in reader:
+            # Пустые ячейки CSV означают отсутствие значения.
+            yield reader.line_num, {
+                key: value if value != '' else None
+                for key, value in record.items()
+            }
+        return
+    for line, text in enumerate(file, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError as error:
+            record = InvalidRecord(line, f'некорректный JSON: {error}')
+        yield line, record
+
+
+def _as_bool(value, default=True):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def _as_datetime(value, line, field):
+    if value is None:
+        return timezone.now()
+    moment = parse_datetime(str(value))
+    if moment is None:
+        raise InvalidRecord(line, f'некорректная дата в поле {field}')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def _inserted_pks(model, objs):
+    """Первичные ключи объектов, только что сохранённых bulk_create().
+
+    Ключи идут в порядке objs. SQLite в Django 3.2 не возвращает pk из
+    bulk_create(); тогда новые строки — последние по pk: с первой вставки
+    до конца транзакции SQLite не пускает писать другие соединения,
+    а AUTOINCREMENT не выдаёт номера меньше уже выданных.
+    """
+    if all(obj.pk is not None for obj in objs):
+        return [obj.pk for obj in objs]
+    pks = model.objects.order_by('-pk').values_list('pk', flat=True)
+    return list(pks[:len(objs)])[::-1]
+
+
+def bulk_create_with_dates(model, objs, batch_size):
+    """Сохраняет objs через bulk_create() с created_at из архива.
+
+    auto_now_add подменяет created_at временем вставки, поэтому даты
+    из архива записываются следом UPDATE по pk.
+    """
+    if not objs:
+        return
+    dates = [obj.created_at for obj in objs]
+    model.objects.bulk_create(objs, batch_size=batch_size)
+    rows = list(zip(_inserted_pks(model, objs), dates))
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        model.objects.filter(pk__in=[pk for pk, _ in batch]).update(
+            created_at=Case(
+                *(When(pk=pk, then=Value(date)) for pk, date in batch),
+                output_field=DateTimeField(),
+            )
+        )
+
+
+class Importer:
+    """Загружает записи порциями по chunk_size в отдельных транзакциях."""
+
+    def __init__(self, batch_size=500, chunk_size=5000, skip_invalid=False):
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.skip_invalid = skip_invalid
+        self.created = {POST: 0, COMMENT: 0}
+        self.errors = []
+        self.elapsed = 0.0
+        # Теги кеша страниц, затронутых загрузкой.
+        self.tags = set()
+        # Посты, к которым добавлены комментарии: у новых постов без
+        # комментариев comment_count и так равен нулю.
+        self.commented = set()
+        # Справочники естественных ключей целиком помещаются в память.
+        self.users = dict(User.objects.values_list('username', 'pk'))
+        self.categories = dict(Category.objects.values_list('slug', 'pk'))
+        self.locations = dict(Location.objects.values_list('name', 'pk'))
+
+    @property
+    def rows_per_second(self):
+        if not self.elapsed:
+            return 0.0
+        return sum(self.created.values()) / self.elapsed
+
+    def run(self, records, progress=None):
+        start = time.perf_counter() - self.elapsed
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, self.chunk_size))
+            if not chunk:
+                break
+            with transaction.atomic():
+                self.import_chunk(chunk)
+            self.elapsed = time.perf_counter() - start
+            if progress:
+                progress(self)
+        if self.commented:
+            update_comment_counts(Post.objects.filter(pk__in=self.commented))
+            self.commented.clear()
+        if any(self.created.values()):
+            invalidate_tags(*self.tags)
+            reset_next_publication()
+        self.elapsed = time.perf_counter() - start
+        return self.created
+
+    def import_chunk(self, chunk):
+        posts, comments = [], []
+        for line, record in chunk:
+            try:
+                if isinstance(record, InvalidRecord):
+                    raise record
+                kind = record.get('type')
+                if kind == POST:
+                    posts.append(self.build_post(line, record))
+                elif kind == COMMENT:
+                    comments.append((line, self.build_comment(line, record)))
+                else:
+                    raise InvalidRecord(line, f'неизвестный тип {kind!r}')
+            except InvalidRecord as error:
+                self.fail(error)
+        # Посты сохраняются первыми: на них могут ссылаться комментарии
+        # той же порции.
+        self.save_posts(posts)
+        self.save_comments(comments)
+
+    def save_posts(self, posts):
+        # Посты с id из архива сохраняются раньше остальных, чтобы номера
+        # новых строк оказались последними (см. _inserted_pks).
+        for group in (
+            [post for post in posts if post.pk is not None],
+            [post for post in posts if post.pk is None],
+        ):
+            bulk_create_with_dates(Post, group, self.batch_size)
+        self.created[POST] += len(posts)
+        self.tags.add(INDEX_TAG)
+        for post in posts:
+            self.tags.update((
+                category_feed_tag(post.category_id),
+                user_feed_tag(post.author_id),
+            ))
+
+    def save_comments(self, comments):
+        existing = set(Post.objects.filter(
+            pk__in={comment.post_id for _, comment in comments}
+        ).values_list('pk', flat=True))
+        valid = []
+        for line, comment in comments:
+            if comment.post_id in existing:
+                valid.append(comment)
+            else:
+                self.fail(InvalidRecord(
+                    line, f'нет публикации с id {comment.post_id}'
+                ))
+        bulk_create_with_dates(Comment, valid, self.batch_size)
+        self.created[COMMENT] += len(valid)
+        if valid:
+            self.tags.add(COMMENTS_TAG)
+        self.commented.update(comment.post_id for comment in valid)
+        self.tags.update(post_tag(comment.post_id) for comment in valid)
+
+    def fail(self, error):
+        if not self.skip_invalid:
+            raise error
+        self.errors.append(error)
+
+    def lookup(self, line, mapping, value, field, required=True):
+        if value is None:
+            if required:
+                raise InvalidRecord(line, f'не заполнено поле {field}')
+            return None
+        try:
+            return mapping[value]
+        except KeyError:
+            raise InvalidRecord(line, f'{field} {value!r} не найден')
+
+    def build_post(self, line, record):
+        for field in ('title', 'text'):
+            if not record.get(field):
+                raise InvalidRecord(line, f'не заполнено поле {field}')
+        return Post(
+            pk=record.get('id'),
+            title=record['title'][:Post._meta.get_field('title').max_length],
+            text=record['text'],
+            pub_date=_as_datetime(record.get('pub_date'), line, 'pub_date'),
+            created_at=_as_datetime(
+                record.get('created_at'), line, 'created_at'
+            ),
+            is_published=_as_bool(record.get('is_published')),
+            author_id=self.lookup(
+                line, self.users, record.get('author'), 'author'
+            ),
+            category_id=self.lookup(
+                line,
+                self.categories,
+                record.get('category'),
+                'category',
+                required=False,
+            ),
+            location_id=self.lookup(
+                line,
+                self.locations,
+                record.get('location'),
+                'location',
+                required=False,
+            ),
+        )
+
+    def build_comment(self, line, record):
+        if not record.get('text'):
+            raise InvalidRecord(line, 'не заполнено поле text')
+        try:
+            post_id = int(record.get('post'))
+        except (TypeError, ValueError):
+            raise InvalidRecord(
+                line, 'поле post должно содержать id публикации'
+            )
+        return Comment(
+            text=record['text'],
+            post_id=post_id,
+            created_at=_as_datetime(
+                record.get('created_at'), line, 'created_at'
+            ),
+            is_published=_as_bool(record.get('is_published')),
+            author_id=self.lookup(
+                line, self.users, record.get('author'), 'author'
+            ),
+        )
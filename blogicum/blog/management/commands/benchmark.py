@@ -0,0 +1,56 @@
+import json
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import compare
+
+
+def parse_option(value):
+    name, sep, raw = value.partition('=')
+    if not sep or not name:
+        raise CommandError(f'Ожидается ИМЯ=ЗНАЧЕНИЕ, получено {value!r}')
+    try:
+        return name, int(raw)
+    except ValueError:
+        return name, raw
+
+
+class Command(BaseCommand):
+    help = 'Запускает сценарий из пакета benchmarks и печатает отчёт JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', help='Имя модуля в пакете benchmarks.')
+        parser.add_argument('--iterations', type=int)
+        parser.add_argument(
+            '--set',
+            action='append',
+            default=[],
+            metavar='ИМЯ=ЗНАЧЕНИЕ',
+            help='Параметр сценария, например posts=10000 или seed=1.',
+        )
+        parser.add_argument('--output', help='Файл для отчёта JSON.')
+        parser.add_argument(
+            '--baseline',
+            help='Прошлый отчёт JSON; в отчёт добавятся изменения в %%.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            scenario = import_module(f'benchmarks.{options["scenario"]}')
+        except ImportError as error:
+            raise CommandError(
+                f'Неизвестный сценарий {options["scenario"]}: {error}'
+            )
+        kwargs = dict(map(parse_option, options['set']))
+        if options['iterations']:
+            kwargs['iterations'] = options['iterations']
+        result = scenario.run(**kwargs)
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                result['changes'] = compare(result, json.load(file))
+        report = json.dumps(result, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        self.stdout.write(report)
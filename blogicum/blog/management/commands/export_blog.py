@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.exporting import (
+    COMMENTS,
+    FORMATS,
+    POSTS,
+    export_lines,
+    export_queryset,
+)
+from blog.forms import ExportForm
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты или комментарии в CSV или JSONL потоком.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=(POSTS, COMMENTS))
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument(
+            '--from', dest='date_from', help='Начало периода, ГГГГ-ММ-ДД.'
+        )
+        parser.add_argument(
+            '--to', dest='date_to', help='Конец периода включительно.'
+        )
+        parser.add_argument('--category', help='Slug категории.')
+        parser.add_argument(
+            '--output', help='Файл выгрузки; по умолчанию стандартный вывод.'
+        )
+
+    def handle(self, *args, **options):
+        form = ExportForm({
+            'date_from': options['date_from'],
+            'date_to': options['date_to'],
+            'category': options['category'],
+            'format': options['format'],
+        })
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+        lines = export_lines(
+            options['kind'],
+            export_queryset(
+                options['kind'],
+                form.cleaned_data['date_from'],
+                form.cleaned_data['date_to'],
+                form.cleaned_data['category'],
+            ),
+            options['format'],
+        )
+        if options['output']:
+            with open(
+                options['output'], 'w', encoding='utf-8', newline=''
+            ) as file:
+                file.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,97 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from blog.importing import COMMENT, POST, Importer, InvalidRecord, read_records
+
+FORMATS = ('jsonl', 'csv')
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты и комментарии из файлов JSONL или CSV порциями '
+        'через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='+', help='Файлы архива; «-» — стандартный ввод.'
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Формат файлов; по умолчанию определяется по расширению.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Строк в одном INSERT.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Строк в одной транзакции.',
+        )
+        parser.add_argument(
+            '--skip-invalid',
+            action='store_true',
+            help='Пропускать ошибочные записи вместо остановки загрузки.',
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        importer = Importer(
+            batch_size=options['batch_size'],
+            chunk_size=options['chunk_size'],
+            skip_invalid=options['skip_invalid'],
+        )
+        for path in options['paths']:
+            file_format = options['format'] or self.detect_format(path)
+            try:
+                if path == '-':
+                    self.load(importer, sys.stdin, file_format)
+                else:
+                    with open(path, encoding='utf-8', newline='') as file:
+                        self.load(importer, file, file_format)
+            except (InvalidRecord, IntegrityError) as error:
+                # Порции до ошибочной уже сохранены в своих транзакциях.
+                raise CommandError(
+                    f'{path}: {error}. Загружено публикаций: '
+                    f'{importer.created[POST]}, комментариев: '
+                    f'{importer.created[COMMENT]}'
+                )
+        for error in importer.errors:
+            self.stderr.write(f'Пропущено: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено публикаций: {importer.created[POST]}, '
+            f'комментариев: {importer.created[COMMENT]} '
+            f'за {importer.elapsed:.1f} с '
+            f'({importer.rows_per_second:.0f} строк/с)'
+        ))
+
+    def load(self, importer, file, file_format):
+        importer.run(
+            read_records(file, file_format), progress=self.progress
+        )
+
+    def progress(self, importer):
+        if self.verbosity > 1:
+            self.stdout.write(
+                f'{sum(importer.created.values())} строк, '
+                f'{importer.rows_per_second:.0f} строк/с'
+            )
+
+    @staticmethod
+    def detect_format(path):
+        extension = os.path.splitext(path)[1].lstrip('.').lower()
+        if extension == 'json':
+            extension = 'jsonl'
+        if extension not in FORMATS:
+            raise CommandError(
+                f'Не удалось определить формат {path}; укажите --format.'
+            )
+        return extension
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from blog.cache import cache_is_shared
+from blog.scheduling import next_publication, publish_due
+
+
+class Command(BaseCommand):
+    help = (
+        'Сбрасывает и прогревает кеш лент, в которых вышли отложенные '
+        'публикации. Нужен общий для процессов кеш (см. CACHES).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать постоянно, просыпаясь к ближайшей публикации.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=60,
+            help='Наибольшая пауза между проверками в режиме --loop, секунд.',
+        )
+        parser.add_argument(
+            '--no-warm',
+            action='store_true',
+            help='Только сбрасывать кеш, не рендеря страницы заново.',
+        )
+
+    def handle(self, *args, **options):
+        if not cache_is_shared():
+            raise CommandError(
+                'Кеш в памяти процесса: сброс из команды не дойдёт до '
+                'веб-сервера. Настройте общий кеш в CACHES.'
+            )
+        while True:
+            posts = publish_due(warm=not options['no_warm'])
+            if posts:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Вышло публикаций: {len(posts)}')
+                )
+            if not options['loop']:
+                return
+            time.sleep(self.pause(options['interval']))
+
+    @staticmethod
+    def pause(interval):
+        upcoming = next_publication()
+        if upcoming is None:
+            return interval
+        seconds = (upcoming - timezone.now()).total_seconds()
+        return min(interval, max(seconds, 0))
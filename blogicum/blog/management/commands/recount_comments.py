@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from blog.query_utils import update_comment_counts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённое количество комментариев у постов.'
+
+    def handle(self, *args, **options):
+        updated = update_comment_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
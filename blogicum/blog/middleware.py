@@ -0,0 +1,353 @@
+"""Middleware блога.
+
+ViewMetricsMiddleware считает для каждого запроса число SQL-запросов,
+время в базе, время рендеринга шаблонов и общее время. Результат уходит
+в заголовок Server-Timing и в лог blog.metrics (время шаблонов считает
+бэкенд blog.templating.TimedDjangoTemplates); превышение бюджета из
+VIEW_BUDGETS пишется в лог как предупреждение или, при
+VIEW_BUDGET_RAISE, вызывает исключение BudgetExceeded. При
+TEMPLATE_PROFILING в лог пишется и время каждого шаблона и {% include %}.
+
+ReplicaStickinessMiddleware после записи направляет чтения пользователя
+на основную базу (см. blog.routers).
+
+RenderStartedMiddleware запоминает время начала запроса: фрагменты
+шаблонов не кешируются, если их теги сброшены позже (blog.cache).
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.template import base
+from django.template.loader_tags import IncludeNode
+
+from .cache import begin_render, end_render
+from .routers import begin_request, end_request
+
+logger = logging.getLogger('blog.metrics')
+
+_current = ContextVar('view_metrics', default=None)
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class ViewMetrics:
+
+    def __init__(self, profile_templates=False):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.total_time = 0.0
+        self._template_depth = 0
+        # Шаблон или include -> [вызовы, общее время, собственное время].
+        self.templates = {} if profile_templates else None
+        self._template_stack = []
+        self._next_kind = 'template'
+        # Асинхронные view выполняют запросы из нескольких потоков сразу.
+        self._lock = threading.Lock()
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.queries += 1
+                self.db_time += elapsed
+
+    def profile_template(self, name, render, *args):
+        key = f'{self._next_kind} {name}'
+        self._next_kind = 'template'
+        self._template_stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return render(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._template_stack.pop()
+            if self._template_stack:
+                self._template_stack[-1] += elapsed
+            entry = self.templates.setdefault(key, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] += elapsed - children
+
+    def template_profile(self):
+        """Шаблоны запроса по убыванию собственного времени рендеринга."""
+        return [
+            {
+                'template': key,
+                'calls': calls,
+                'total_ms': round(total * 1000, 2),
+                'self_ms': round(own * 1000, 2),
+            }
+            for key, (calls, total, own) in sorted(
+                self.templates.items(), key=lambda item: -item[1][2]
+            )
+        ]
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 2),
+            'template_ms': round(self.template_time * 1000, 2),
+            'total_ms': round(self.total_time * 1000, 2),
+        }
+
+    def server_timing(self):
+        return ', '.join((
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_time * 1000:.2f}',
+            f'total;dur={self.total_time * 1000:.2f}',
+        ))
+
+
+def timed_render(render, *args):
+    """Вызывает render, учитывая время в метриках текущего запроса.
+
+    Вызывается бэкендом шаблонов blog.templating.TimedDjangoTemplates.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return render(*args)
+    # render_to_string() внутри шаблонного тега не учитывается дважды.
+    metrics._template_depth += 1
+    start = time.perf_counter()
+    try:
+        return render(*args)
+    finally:
+        metrics._template_depth -= 1
+        if not metrics._template_depth:
+            metrics.template_time += time.perf_counter() - start
+
+
+def _profiled_render(render):
+    # base.Template._render вызывается и для шаблона страницы, и для
+    # родителей {% extends %}, и для каждого {% include %}.
+
+    def wrapper(self, context):
+        metrics = _current.get()
+        if metrics is None or metrics.templates is None:
+            return render(self, context)
+        name = self.origin.template_name or self.name or '<string>'
+        return metrics.profile_template(name, render, self, context)
+
+    wrapper.profiled = True
+    return wrapper
+
+
+def _profiled_include(render):
+
+    def wrapper(self, context):
+        metrics = _current.get()
+        if metrics is not None and metrics.templates is not None:
+            metrics._next_kind = 'include'
+        return render(self, context)
+
+    wrapper.profiled = True
+    return wrapper
+
+
+def install_template_profiler():
+    """Подключает профиль шаблонов; нужен только при TEMPLATE_PROFILING."""
+    if not getattr(base.Template._render, 'profiled', False):
+        base.Template._render = _profiled_render(base.Template._render)
+    if not getattr(IncludeNode.render, 'profiled', False):
+        IncludeNode.render = _profiled_include(IncludeNode.render)
+
+
+def check_budget(view_name, metrics):
+    """Сообщения о превышении бюджета представления, если оно есть."""
+    budget = settings.VIEW_BUDGETS.get(view_name)
+    if not budget:
+        return []
+    problems = []
+    if 'queries' in budget and metrics.queries > budget['queries']:
+        problems.append(
+            f'{metrics.queries} queries > {budget["queries"]}'
+        )
+    total_ms = metrics.total_time * 1000
+    if 'ms' in budget and total_ms > budget['ms']:
+        problems.append(f'{total_ms:.0f} ms > {budget["ms"]} ms')
+    return problems
+
+
+@contextmanager
+def query_metrics():
+    """Учитывает запросы текущего потока в метриках текущего запроса.
+
+    Соединения с базой у каждого потока свои, поэтому асинхронные view
+    оборачивают этим запросы, выполняемые в потоках sync_to_async.
+    """
+    metrics = _current.get()
+    with ExitStack() as stack:
+        if metrics is not None:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(metrics.record_query)
+                )
+        yield
+
+
+class ViewMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так Django узнаёт, что middleware вызывается через await.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        if settings.TEMPLATE_PROFILING:
+            # Не при импорте: тестовое окружение Django при запуске
+            # подменяет Template._render своей версией.
+            install_template_profiler()
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        metrics = ViewMetrics(settings.TEMPLATE_PROFILING)
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with query_metrics():
+                response = self.get_response(request)
+        finally:
+            metrics.total_time = time.perf_counter() - start
+            _current.reset(token)
+        return self.report(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = ViewMetrics(settings.TEMPLATE_PROFILING)
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        # Синхронные middleware и sync_to_async() внутри view выполняются
+        # в одном потоке запроса: его запросы учитываются так же.
+        thread_queries = ExitStack()
+        try:
+            await sync_to_async(thread_queries.enter_context)(
+                query_metrics()
+            )
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(thread_queries.close)()
+        finally:
+            metrics.total_time = time.perf_counter() - start
+            _current.reset(token)
+        return self.report(request, response, metrics)
+
+    def report(self, request, response, metrics):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return response
+        response['Server-Timing'] = metrics.server_timing()
+        logger.info(json.dumps({
+            'view': match.view_name,
+            'method': request.method,
+            'status': response.status_code,
+            **metrics.as_dict(),
+        }))
+        if metrics.templates:
+            logger.info(json.dumps({
+                'view': match.view_name,
+                'templates': metrics.template_profile(),
+            }))
+        problems = check_budget(match.view_name, metrics)
+        if problems:
+            message = f'{match.view_name}: {", ".join(problems)}'
+            if settings.VIEW_BUDGET_RAISE:
+                raise BudgetExceeded(message)
+            logger.warning('budget exceeded %s', message)
+        return response
+
+
+class ReplicaStickinessMiddleware:
+    """После записи закрепляет пользователя за основной базой.
+
+    Метка — cookie со временем, до которого чтение идёт с основной базы,
+    поэтому работает и для анонимов, и без обращения к сессии.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        state, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        state, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self.finish(state, response)
+
+    def start(self, request):
+        try:
+            until = float(
+                request.COOKIES.get(settings.REPLICA_STICKY_COOKIE, 0)
+            )
+        except ValueError:
+            until = 0
+        return begin_request(sticky=until > time.time())
+
+    def finish(self, state, response):
+        if state.wrote:
+            seconds = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE,
+                str(time.time() + seconds),
+                max_age=seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class RenderStartedMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = begin_render()
+        try:
+            return self.get_response(request)
+        finally:
+            end_render(token)
+
+    async def __acall__(self, request):
+        token = begin_render()
+        try:
+            return await self.get_response(request)
+        finally:
+            end_render(token)
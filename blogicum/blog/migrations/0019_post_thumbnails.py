@@ -0,0 +1,42 @@
+from importlib import import_module
+
+from django.db import migrations, models
+
+search = import_module('blog.migrations.0018_post_search')
+
+# SQLite добавляет поле, пересоздавая таблицу blog_post, и вместе с ней
+# удаляет триггеры полнотекстового индекса; создаём их заново.
+recreate_triggers = search.run_on_sqlite(
+    search.BACKWARD[:3] + search.FORWARD[1:4]
+)
+
+
+def enqueue_thumbnails(apps, schema_editor):
+    # Ширины копий, созданных раньше, неизвестны: создаём копии заново.
+    Post = apps.get_model('blog', 'Post')
+    Job = apps.get_model('jobs', 'Job')
+    Job.objects.bulk_create(
+        Job(task='blog.tasks.generate_post_thumbnails', args=[post_id])
+        for post_id in Post.objects.exclude(image='').values_list(
+            'pk', flat=True
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_post_search'),
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, recreate_triggers),
+        migrations.AddField(
+            model_name='post',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Уменьшенные копии'),
+        ),
+        migrations.RunPython(recreate_triggers, migrations.RunPython.noop),
+        migrations.RunPython(enqueue_thumbnails, migrations.RunPython.noop),
+    ]
@@ -92,10 +92,41 @@ class Post(Basemodel):
         verbose_name='Категория'
     )
     image = models.ImageField('Фото', upload_to='post_images', blank=True)
+    # Ширины готовых уменьшенных копий image: имя размера -> px.
+    thumbnails = models.JSONField(
+        'Уменьшенные копии',
+        default=dict,
+        blank=True,
+        editable=False
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
 
     class Meta:
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
         default_related_name = 'posts'
+        # Индексы под выборки general_request: главная лента, лента
+        # категории и профиль автора сортируются по FEED_ORDERING
+        # (-pub_date, -id).
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_published_feed_idx',
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                name='post_category_feed_idx',
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+        )
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
 
@@ -121,6 +152,14 @@ class Comment(Basemodel):
     class Meta:
         ordering = ('created_at',)
         default_related_name = 'comments'
+        # Комментарии поста листаются курсором по COMMENT_ORDERING
+        # (created_at, id).
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_page_idx',
+            ),
+        )
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
 
@@ -1,8 +1,288 @@
-from django.core.paginator import Paginator
+import base64
+import binascii
+import json
 
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
 
-def pagination(request, related_name, posts_on_page):
-    paginator = Paginator(related_name, posts_on_page)
+CURSOR_PARAM = 'cursor'
+
+FEED_ORDERING = ('-pub_date', '-id')
+
+COMMENT_ORDERING = ('created_at', 'id')
+
+NEXT = 'n'
+
+INTEGER_LIMIT = 2 ** 63
+
+PREVIOUS = 'p'
+
+# Номеров страниц по обе стороны от текущей и у краёв ленты.
+PAGE_WINDOW = 3
+
+PAGE_WINDOW_ENDS = 1
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class WindowedPage(Page):
+
+    @property
+    def page_window(self):
+        return self.paginator.page_window(self.number)
+
+
+class WindowedPaginator(Paginator):
+    """Paginator, который показывает окно номеров вокруг текущей страницы.
+
+    Вместо всего page_range шаблону отдаётся не больше
+    2 * (PAGE_WINDOW + PAGE_WINDOW_ENDS) + 3 номеров с пропусками
+    ELLIPSIS, сколько бы страниц ни было в ленте. Уже известное число
+    записей можно передать в count, а для ленты из blog.counting — её
+    scope: тогда число берётся из кеша и может быть приблизительным.
+    """
+
+    def __init__(
+            self, object_list, per_page, count=None, scope=None, **kwargs
+    ):
+        super().__init__(object_list, per_page, **kwargs)
+        self.scope = scope
+        self._approximate = False
+        if count is not None:
+            self.count = count
+
+    @cached_property
+    def count(self):
+        if self.scope is None:
+            return super().count
+        from .counting import feed_count
+
+        count, self._approximate = feed_count(self.scope)
+        return count
+
+    @property
+    def count_is_approximate(self):
+        # Точность становится известна вместе с самим числом.
+        self.count
+        return self._approximate
+
+    def validate_number(self, number):
+        if not self.count_is_approximate:
+            return super().validate_number(number)
+        # Приблизительное число может быть меньше настоящего, поэтому
+        # номера за последней страницей допустимы, пока на них есть посты;
+        # num_pages уточняется по записям открытой страницы в page().
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        if not self.count_is_approximate:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        # Лишняя запись показывает, есть ли следующая страница на самом деле.
+        object_list = list(
+            self.object_list[bottom:bottom + self.per_page + 1]
+        )
+        if not object_list and number > 1:
+            raise EmptyPage('That page contains no results')
+        if len(object_list) > self.per_page:
+            self.num_pages = max(self.num_pages, number + 1)
+        else:
+            self.num_pages = number
+        return self._get_page(object_list[:self.per_page], number, self)
+
+    def get_page(self, number):
+        try:
+            return super().get_page(number)
+        except EmptyPage:
+            # Пустая страница за приблизительным концом ленты.
+            try:
+                return self.page(self.num_pages)
+            except EmptyPage:
+                return self.page(1)
+
+    def page_window(self, number):
+        return list(self.get_elided_page_range(
+            number, on_each_side=PAGE_WINDOW, on_ends=PAGE_WINDOW_ENDS
+        ))
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+
+class CursorPage:
+    """Страница ленты, полученная через курсор, а не через OFFSET."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация по набору полей сортировки.
+
+    Вместо COUNT(*) и OFFSET страница ищется условием WHERE по значениям
+    полей последней (или первой) записи предыдущей страницы, поэтому
+    глубокие страницы обходятся так же дёшево, как первая.
+    """
+
+    def __init__(self, queryset, per_page, ordering=FEED_ORDERING):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def encode_cursor(self, obj, direction):
+        values = [
+            self._field(name).value_to_string(obj) for name in self.fields
+        ]
+        raw = json.dumps([direction, values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, values = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            if direction not in (NEXT, PREVIOUS):
+                raise ValueError(direction)
+            if len(values) != len(self.fields):
+                raise ValueError(values)
+            values = [
+                self._to_python(name, value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (
+            binascii.Error, TypeError, ValueError, ValidationError
+        ) as error:
+            raise InvalidCursor(cursor) from error
+        return direction, values
+
+    def page(self, cursor=None):
+        direction, values = (
+            self.decode_cursor(cursor) if cursor else (NEXT, None)
+        )
+        backwards = direction == PREVIOUS
+        ordering = (
+            [self._reverse(name) for name in self.ordering]
+            if backwards else list(self.ordering)
+        )
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek(ordering, values))
+
+        items = list(queryset[:self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if backwards:
+            items.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        return CursorPage(
+            items,
+            self,
+            (self.encode_cursor(items[-1], NEXT)
+             if items and has_next else None),
+            (self.encode_cursor(items[0], PREVIOUS)
+             if items and has_previous else None),
+        )
+
+    def get_page(self, cursor=None):
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
+
+    def _field(self, name):
+        return self.queryset.model._meta.get_field(name)
+
+    def _to_python(self, name, value):
+        field = self._field(name)
+        value = field.to_python(value)
+        if isinstance(value, int):
+            # Число вне диапазона столбца база не примет (OverflowError).
+            # SQLite диапазон не сообщает, но хранит не больше 64 бит.
+            low, high = connections[
+                self.queryset.db
+            ].ops.integer_field_range(field.get_internal_type())
+            low = -INTEGER_LIMIT if low is None else low
+            high = INTEGER_LIMIT - 1 if high is None else high
+            if not low <= value <= high:
+                raise ValueError(value)
+        return value
+
+    def _seek(self, ordering, values):
+        condition = Q()
+        equal = {}
+        for name, value in zip(ordering, values):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    @staticmethod
+    def _reverse(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+
+def use_cursor(request):
+    return CURSOR_PARAM in request.GET or settings.CURSOR_PAGINATION
+
+
+def cursor_pagination(request, queryset, per_page, ordering=FEED_ORDERING):
+    paginator = CursorPaginator(queryset, per_page, ordering)
+
+    return paginator.get_page(request.GET.get(CURSOR_PARAM))
+
+
+def pagination(
+        request, related_name, posts_on_page, allow_cursor=True, scope=None
+):
+    if allow_cursor and use_cursor(request):
+        return cursor_pagination(request, related_name, posts_on_page)
+
+    paginator = WindowedPaginator(related_name, posts_on_page, scope=scope)
     page_number = request.GET.get('page')
 
     return paginator.get_page(page_number)
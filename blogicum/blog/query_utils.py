@@ -1,13 +1,13 @@
-from django.db.models import Count
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
-from .models import Post
+from .models import Comment, Post
 
 
 def general_request(
         model_manager=Post.objects,
         hidden_post=True,
-        comments=False
 ):
     queryset = model_manager.select_related(
         'location',
@@ -22,7 +22,31 @@ def general_request(
             category__is_published=True,
         )
 
-    if comments:
-        queryset = queryset.annotate(comment_count=Count('comments'))
-
     return queryset
+
+
+def visible_posts(user, queryset=Post.objects):
+    """Посты, которые пользователь может открыть: все свои и опубликованные."""
+    if user.is_authenticated:
+        return queryset.filter(
+            Q(author=user)
+            | (
+                Q(is_published=True)
+                & Q(pub_date__lte=timezone.now())
+                & Q(category__is_published=True)
+            )
+        )
+
+    return general_request(queryset, hidden_post=True)
+
+
+def update_comment_counts(posts=None):
+    """Пересчитывает Post.comment_count одним UPDATE с подзапросом."""
+    if posts is None:
+        posts = Post.objects.all()
+
+    counts = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+
+    return posts.update(comment_count=Coalesce(Subquery(counts), 0))
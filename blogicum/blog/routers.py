@@ -0,0 +1,86 @@
+"""Чтение публичных страниц с реплик базы.
+
+Запросы на чтение уходят на реплики из DATABASE_REPLICAS только внутри
+представлений, помеченных use_replica; запись всегда идёт на основную
+базу. Пользователь, который только что что-то записал, ещё
+REPLICA_STICKY_SECONDS читает с основной базы (см.
+ReplicaStickinessMiddleware), поэтому видит свои изменения, даже если
+реплика отстаёт.
+"""
+import asyncio
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_use_replica = ContextVar('use_replica', default=False)
+
+_request_state = ContextVar('replica_request_state', default=None)
+
+
+class RequestState:
+    """Состояние запроса: читать только с основной базы и была ли запись."""
+
+    def __init__(self, sticky=False):
+        self.sticky = sticky
+        self.wrote = False
+
+
+def begin_request(sticky=False):
+    state = RequestState(sticky)
+    return state, _request_state.set(state)
+
+
+def end_request(token):
+    _request_state.reset(token)
+
+
+def use_replica(view):
+    """Разрешает представлению читать с реплики."""
+    if asyncio.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            token = _use_replica.set(True)
+            try:
+                return await view(*args, **kwargs)
+            finally:
+                _use_replica.reset(token)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = _use_replica.set(True)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+
+    return wrapper
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or not _use_replica.get():
+            return None
+        state = _request_state.get()
+        if state is not None and (state.sticky or state.wrote):
+            return DEFAULT_DB_ALIAS
+        # Внутри транзакции реплика не видит её незафиксированных изменений.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, объекты с любой из них совместимы.
+        return True
@@ -0,0 +1,154 @@
+"""Отложенные публикации и кеш страниц.
+
+Посты с pub_date в будущем скрыты general_request() и появляются в лентах
+без какого-либо события в базе, поэтому закешированные страницы живут
+не дольше, чем до ближайшей отложенной публикации, а планировщик
+сбрасывает и прогревает ленты в момент её выхода.
+
+Сброс и прогрев из отдельного процесса (publish_scheduled) доходят до
+веб-сервера только через общий кеш; с кешем в памяти процесса ленты
+обновляет лишь таймер PUBLICATION_TIMER внутри самого сервера.
+"""
+import asyncio
+import math
+import threading
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from .cache import (
+    INDEX_TAG,
+    category_feed_tag,
+    invalidate_tags,
+    post_tag,
+    user_feed_tag,
+)
+from .models import Post
+from .query_utils import general_request
+
+NEXT_PUBLICATION_KEY = 'blog:next-publication'
+
+LAST_CHECK_KEY = 'blog:publication-check'
+
+_timer = None
+
+_timer_lock = threading.Lock()
+
+
+def next_publication():
+    """Ближайшая будущая дата публикации среди опубликованных постов."""
+    now = timezone.now()
+    cached = cache.get(NEXT_PUBLICATION_KEY)
+    if cached is None or (cached[0] is not None and cached[0] <= now):
+        upcoming = Post.objects.filter(
+            is_published=True, pub_date__gt=now
+        ).order_by('pub_date').values_list('pub_date', flat=True).first()
+        cached = (upcoming,)
+        cache.set(NEXT_PUBLICATION_KEY, cached, timeout=None)
+        if upcoming is not None and settings.PUBLICATION_TIMER:
+            start_publication_timer(upcoming)
+    return cached[0]
+
+
+def reset_next_publication():
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def cap_timeout(timeout):
+    """Ограничивает время жизни кеша моментом ближайшей публикации."""
+    upcoming = next_publication()
+    if upcoming is None:
+        return timeout
+    seconds = math.ceil((upcoming - timezone.now()).total_seconds())
+    return max(1, min(timeout, seconds))
+
+
+def publish_due(warm=True):
+    """Сбрасывает ленты с постами, вышедшими после прошлой проверки.
+
+    Возвращает список вышедших постов; при warm=True первые страницы
+    затронутых лент сразу рендерятся заново и попадают в кеш.
+    """
+    now = timezone.now()
+    since = cache.get(LAST_CHECK_KEY) or (
+        now - timedelta(seconds=settings.PAGE_CACHE_TIMEOUT)
+    )
+    posts = list(
+        general_request().filter(pub_date__gt=since, pub_date__lte=now)
+    )
+    cache.set(LAST_CHECK_KEY, now, timeout=None)
+    reset_next_publication()
+    if not posts:
+        return posts
+
+    tags = {INDEX_TAG}
+    urls = {reverse('blog:index')}
+    for post in posts:
+        tags.update((
+            post_tag(post.pk),
+            category_feed_tag(post.category_id),
+            user_feed_tag(post.author_id),
+        ))
+        urls.update((
+            reverse('blog:category_posts', args=[post.category.slug]),
+            reverse('blog:profile', args=[post.author.username]),
+        ))
+    invalidate_tags(*tags)
+    if warm:
+        warm_pages(urls)
+    return posts
+
+
+def warm_pages(urls):
+    """Рендерит страницы для анонимного читателя, заполняя кеш."""
+    factory = RequestFactory()
+    for url in urls:
+        request = factory.get(url)
+        request.user = AnonymousUser()
+        match = resolve(url)
+        view = match.func
+        # При ASYNC_VIEWS адреса ведут на корутины из blog.async_views.
+        if asyncio.iscoroutinefunction(view):
+            view = async_to_sync(view)
+        response = view(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+
+
+def start_publication_timer(when):
+    """Запускает в процессе таймер, срабатывающий в момент публикации."""
+    global _timer
+
+    with _timer_lock:
+        if (
+            _timer is not None
+            and _timer.is_alive()
+            and _timer.when <= when
+        ):
+            return
+        if _timer is not None:
+            _timer.cancel()
+        delay = max((when - timezone.now()).total_seconds(), 0)
+        _timer = threading.Timer(delay, _on_publication)
+        _timer.when = when
+        _timer.daemon = True
+        _timer.start()
+
+
+def _on_publication():
+    global _timer
+
+    with _timer_lock:
+        _timer = None
+    try:
+        publish_due()
+        next_publication()
+    finally:
+        connections.close_all()
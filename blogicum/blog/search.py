@@ -0,0 +1,45 @@
+"""Полнотекстовый поиск по заголовкам и текстам постов.
+
+В SQLite поиск идёт по виртуальной таблице FTS5 blog_post_fts, которую
+триггеры из миграции 0018 держат в согласии с blog_post; результаты
+упорядочены по BM25, совпадения в заголовке весят больше.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+TITLE_WEIGHT = 10.0
+
+TEXT_WEIGHT = 1.0
+
+TERM = re.compile(r'\w+')
+
+
+def match_expression(query):
+    """Запрос FTS5 из пользовательской строки: все слова, по префиксу."""
+    return ' '.join(f'"{term}"*' for term in TERM.findall(query))
+
+
+def search_posts(queryset, query):
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+
+    if connection.vendor != 'sqlite':
+        condition = Q()
+        for term in TERM.findall(query):
+            condition &= Q(title__icontains=term) | Q(text__icontains=term)
+        return queryset.filter(condition)
+
+    return queryset.extra(
+        tables=['blog_post_fts'],
+        where=[
+            'blog_post_fts.rowid = blog_post.id',
+            'blog_post_fts MATCH %s',
+        ],
+        params=[expression],
+        select={
+            'rank': f'bm25(blog_post_fts, {TITLE_WEIGHT}, {TEXT_WEIGHT})',
+        },
+    ).order_by('rank', '-pub_date')
@@ -0,0 +1,157 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from jobs.queue import enqueue
+
+from .auth import user_cache
+from .cache import (
+    COMMENTS_TAG,
+    INDEX_TAG,
+    LOCATIONS_TAG,
+    USERS_TAG,
+    category_feed_tag,
+    category_tag,
+    invalidate_tags,
+    location_tag,
+    post_tag,
+    user_feed_tag,
+    user_tag,
+)
+from .models import Category, Comment, Location, Post
+from .scheduling import reset_next_publication
+from .tasks import generate_post_thumbnails
+from .thumbnails import delete_thumbnails
+
+User = get_user_model()
+
+
+def change_comment_count(post_id, delta):
+    if post_id is None:
+        return
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comment_count__gte=-delta)
+    posts.update(comment_count=F('comment_count') + delta)
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    # __dict__, а не атрибуты: отложенные через only() поля не загружаются.
+    instance._loaded_post_id = instance.__dict__.get('post_id')
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        change_comment_count(instance.post_id, 1)
+    elif instance._loaded_post_id != instance.post_id:
+        # Комментарий перенесли к другому посту (например, в админке).
+        change_comment_count(instance._loaded_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    change_comment_count(instance._loaded_post_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    invalidate_tags(
+        COMMENTS_TAG,
+        post_tag(instance._loaded_post_id),
+        post_tag(instance.post_id),
+    )
+    instance._loaded_post_id = instance.post_id
+
+
+@receiver(post_init, sender=Post)
+def remember_post_relations(sender, instance, **kwargs):
+    instance._loaded_relations = (
+        instance.__dict__.get('category_id'),
+        instance.__dict__.get('author_id'),
+    )
+    image = instance.__dict__.get('image')
+    instance._loaded_image = getattr(image, 'name', image) or ''
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    category_id, author_id = instance._loaded_relations
+    invalidate_tags(
+        INDEX_TAG,
+        post_tag(instance.pk),
+        category_feed_tag(instance.category_id),
+        category_feed_tag(category_id),
+        user_feed_tag(instance.author_id),
+        user_feed_tag(author_id),
+    )
+    instance._loaded_relations = (instance.category_id, instance.author_id)
+    reset_next_publication()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, instance, **kwargs):
+    # Публикация категории меняет состав главной ленты и профилей авторов.
+    authors = Post.objects.filter(
+        category_id=instance.pk
+    ).order_by().values_list('author_id', flat=True).distinct()
+    invalidate_tags(
+        INDEX_TAG,
+        category_tag(instance.pk),
+        *(user_feed_tag(author_id) for author_id in authors),
+    )
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_pages(sender, instance, **kwargs):
+    invalidate_tags(location_tag(instance.pk), LOCATIONS_TAG)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    user_cache.delete(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_pages(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_tags(user_tag(instance.pk), USERS_TAG)
+
+
+@receiver(pre_save, sender=Post)
+def reset_post_thumbnails(sender, instance, raw=False, **kwargs):
+    # Копии нового изображения создаст фоновая задача после сохранения.
+    if not raw and instance._loaded_image != instance.image.name:
+        instance.thumbnails = {}
+
+
+@receiver(post_save, sender=Post)
+def update_post_thumbnails(sender, instance, raw=False, **kwargs):
+    if raw or instance._loaded_image == instance.image.name:
+        return
+    delete_thumbnails(instance._loaded_image, instance.image.storage)
+    if instance.image:
+        enqueue(generate_post_thumbnails, instance.pk)
+    instance._loaded_image = instance.image.name
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_thumbnails(sender, instance, **kwargs):
+    delete_thumbnails(instance.image.name, instance.image.storage)
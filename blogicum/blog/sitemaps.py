@@ -0,0 +1,289 @@
+"""Карта сайта: индекс и части по SITEMAP_CHUNK_SIZE адресов.
+
+Части делятся по диапазонам первичного ключа и читаются потоком через
+iterator(). Готовая часть сохраняется в SITEMAP_ROOT под именем с
+отпечатком её содержимого, поэтому все процессы с одними данными в базе
+собирают и отдают один и тот же файл. Число адресов, lastmod и отпечаток
+каждой части кешируются под версиями тегов раздела: пока данные
+не менялись, ни индекс, ни части не обращаются к базе.
+"""
+import hashlib
+import os
+import tempfile
+import time
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Exists, Max, OuterRef, Q
+from django.db.models.functions import Coalesce, Greatest
+from django.urls import reverse
+from django.utils import timezone
+
+from .cache import COMMENTS_TAG, INDEX_TAG, USERS_TAG, get_tag_versions
+from .models import Category, Post
+from .query_utils import general_request
+from .scheduling import cap_timeout
+
+SITEMAP_PREFIX = 'blog:sitemap:'
+
+User = get_user_model()
+
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+ITERATOR_CHUNK_SIZE = 2000
+
+
+def visible_post_filter(prefix):
+    now = timezone.now()
+    return Q(**{
+        f'{prefix}is_published': True,
+        f'{prefix}pub_date__lte': now,
+        f'{prefix}category__is_published': True,
+    })
+
+
+class Section:
+    """Раздел карты сайта.
+
+    Часть number — объекты с ключами от number * SITEMAP_CHUNK_SIZE до
+    следующей границы, поэтому в части не бывает больше адресов, чем
+    SITEMAP_CHUNK_SIZE, а искать её границы не нужно.
+    """
+
+    name = None
+    url_name = None
+    loc_field = 'pk'
+    tags = (INDEX_TAG,)
+
+    def cache_key(self, *parts):
+        versions = sorted(get_tag_versions(self.tags).items())
+        digest = hashlib.md5(repr((parts, versions)).encode()).hexdigest()
+        return f'{SITEMAP_PREFIX}{self.name}:{digest}'
+
+    def base_queryset(self):
+        raise NotImplementedError
+
+    def annotate(self, queryset):
+        raise NotImplementedError
+
+    def location(self, value):
+        return reverse(self.url_name, args=[value])
+
+    def chunk_count(self):
+        key = self.cache_key('count', settings.SITEMAP_CHUNK_SIZE)
+        count = cache.get(key)
+        if count is None:
+            last_pk = self.base_queryset().aggregate(
+                last=Max('pk')
+            )['last']
+            count = 0 if last_pk is None else (
+                last_pk // settings.SITEMAP_CHUNK_SIZE + 1
+            )
+            cache.set(key, count, cap_timeout(settings.PAGE_CACHE_TIMEOUT))
+        return count
+
+    def chunk(self, number):
+        size = settings.SITEMAP_CHUNK_SIZE
+        return self.base_queryset().filter(
+            pk__gte=number * size, pk__lt=(number + 1) * size
+        )
+
+    def rows(self, queryset):
+        return self.annotate(queryset).order_by('pk').values_list(
+            self.loc_field, 'lastmod'
+        ).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+
+
+class PostSection(Section):
+    name = 'posts'
+    url_name = 'blog:post_detail'
+    tags = (INDEX_TAG, COMMENTS_TAG)
+
+    def base_queryset(self):
+        return general_request().select_related(None)
+
+    def annotate(self, queryset):
+        # lastmod поста — его публикация или последний комментарий.
+        return queryset.annotate(lastmod=Greatest(
+            'pub_date',
+            Coalesce(Max('comments__created_at'), 'pub_date'),
+        ))
+
+
+class CategorySection(Section):
+    name = 'categories'
+    url_name = 'blog:category_posts'
+    loc_field = 'slug'
+
+    def base_queryset(self):
+        return Category.objects.filter(is_published=True)
+
+    def annotate(self, queryset):
+        return queryset.annotate(lastmod=Coalesce(
+            Max('posts__pub_date', filter=visible_post_filter('posts__')),
+            'created_at',
+        ))
+
+
+class ProfileSection(Section):
+    name = 'profiles'
+    url_name = 'blog:profile'
+    loc_field = 'username'
+    tags = (INDEX_TAG, USERS_TAG)
+
+    def base_queryset(self):
+        # В карту попадают только авторы опубликованных постов.
+        return User.objects.filter(Exists(
+            Post.objects.filter(
+                visible_post_filter(''), author=OuterRef('pk')
+            )
+        ))
+
+    def annotate(self, queryset):
+        return queryset.annotate(lastmod=Max(
+            'posts__pub_date', filter=visible_post_filter('posts__')
+        ))
+
+
+SECTIONS = {
+    section.name: section
+    for section in (PostSection(), CategorySection(), ProfileSection())
+}
+
+
+def sitemap_index(base_url):
+    """Строки XML индекса карты сайта."""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<sitemapindex xmlns="{XMLNS}">\n'
+    for section in SECTIONS.values():
+        for number in range(section.chunk_count()):
+            stats = chunk_stats(section, number, base_url)
+            if not stats['total']:
+                continue
+            location = reverse(
+                'blog:sitemap_chunk', args=[section.name, number]
+            )
+            yield (
+                f'<sitemap><loc>{escape(base_url + location)}</loc>'
+                f'{_lastmod(stats["lastmod"])}</sitemap>\n'
+            )
+    yield '</sitemapindex>\n'
+
+
+def sitemap_lines(section, rows, base_url):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<urlset xmlns="{XMLNS}">\n'
+    for value, lastmod in rows:
+        location = escape(base_url + section.location(value))
+        yield f'<url><loc>{location}</loc>{_lastmod(lastmod)}</url>\n'
+    yield '</urlset>\n'
+
+
+def _lastmod(moment):
+    if moment is None:
+        return ''
+    return f'<lastmod>{moment.isoformat(timespec="seconds")}</lastmod>'
+
+
+def chunk_path(section, number, fingerprint):
+    return os.path.join(
+        settings.SITEMAP_ROOT, f'{section.name}-{number}-{fingerprint}.xml'
+    )
+
+
+def chunk_stats(section, number, base_url, rebuild=False):
+    """Число адресов, lastmod и отпечаток части number.
+
+    Считаются при сборке файла части и кешируются под версиями тегов
+    раздела; отложенная публикация ограничивает время жизни записи.
+    """
+    key = section.cache_key('chunk', number, base_url)
+    stats = None if rebuild else cache.get(key)
+    if stats is None:
+        stats = build_chunk(section, number, base_url)
+        cache.set(key, stats, cap_timeout(settings.PAGE_CACHE_TIMEOUT))
+    return stats
+
+
+def build_chunk(section, number, base_url):
+    """Собирает файл части и возвращает её статистику.
+
+    Файл пишется во временный и переименовывается атомарно, поэтому
+    читатели не видят недописанный файл. Имя — отпечаток содержимого
+    из базы: процессы с одними данными получают тот же файл.
+    """
+    stats = {'total': 0, 'lastmod': None, 'fingerprint': None}
+
+    def rows():
+        for value, lastmod in section.rows(section.chunk(number)):
+            stats['total'] += 1
+            if lastmod is not None and (
+                stats['lastmod'] is None or lastmod > stats['lastmod']
+            ):
+                stats['lastmod'] = lastmod
+            yield value, lastmod
+
+    os.makedirs(settings.SITEMAP_ROOT, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(
+        dir=settings.SITEMAP_ROOT, suffix='.tmp'
+    )
+    try:
+        digest = hashlib.md5()
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+            for line in sitemap_lines(section, rows(), base_url):
+                digest.update(line.encode())
+                file.write(line)
+        if stats['total']:
+            stats['fingerprint'] = digest.hexdigest()[:16]
+            path = chunk_path(section, number, stats['fingerprint'])
+            os.replace(temporary, path)
+            remove_stale_chunks(section, number, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return stats
+
+
+def remove_stale_chunks(section, number, current):
+    """Удаляет прежние версии части, собранные давно.
+
+    Свежий файл может ещё читать другой процесс, получивший его имя
+    до пересборки, поэтому версии моложе SITEMAP_KEEP_STALE секунд
+    остаются на диске.
+    """
+    prefix = f'{section.name}-{number}-'
+    deadline = time.time() - settings.SITEMAP_KEEP_STALE
+    for entry in os.scandir(settings.SITEMAP_ROOT):
+        if (
+            entry.name.startswith(prefix)
+            and entry.name.endswith('.xml')
+            and entry.path != current
+        ):
+            try:
+                if entry.stat().st_mtime < deadline:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+def open_chunk(section, number, base_url):
+    """Открытый файл части или None, если в ней нет ни одного адреса.
+
+    Если файла с кешированным отпечатком нет на диске (каталог очищен),
+    часть собирается заново.
+    """
+    stats = chunk_stats(section, number, base_url)
+    for rebuild in (False, True):
+        if rebuild:
+            stats = chunk_stats(section, number, base_url, rebuild=True)
+        if not stats['total']:
+            return None
+        try:
+            return open(
+                chunk_path(section, number, stats['fingerprint']), 'rb'
+            )
+        except FileNotFoundError:
+            if rebuild:
+                raise
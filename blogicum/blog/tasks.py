@@ -0,0 +1,24 @@
+from jobs.queue import task
+
+from .cache import invalidate_tags, post_tag
+from .counting import FeedScope, store_exact_count
+from .models import Post
+from .thumbnails import generate_thumbnails
+
+
+@task
+def generate_post_thumbnails(post_id):
+    post = Post.objects.filter(pk=post_id).only('image').first()
+    if post is None or not post.image:
+        return
+    widths = generate_thumbnails(post.image)
+    # Изображение могли заменить, пока создавались копии.
+    if Post.objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnails=widths
+    ):
+        invalidate_tags(post_tag(post_id))
+
+
+@task
+def refresh_feed_count(kind, pk=None, hidden=True):
+    store_exact_count(FeedScope(kind, pk, hidden))
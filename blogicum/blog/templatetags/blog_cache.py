@@ -0,0 +1,51 @@
+from django import template
+from django.templatetags.cache import CacheNode
+
+from blog.cache import changed_since_render, get_tag_versions, post_tags
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card_version(post):
+    """Версия карточки поста для ключа {% fresh_cache %}.
+
+    Складывается из версий тегов поста, его категории, местоположения и
+    автора, поэтому меняется при любой правке данных, видных в карточке.
+    None, если правка случилась уже после начала запроса: пост мог быть
+    выбран до неё, и такую карточку кешировать нельзя.
+    """
+    versions = get_tag_versions(post_tags(post))
+    if changed_since_render(versions):
+        return None
+    return '-'.join(str(versions[tag]) for tag in sorted(versions))
+
+
+class FreshCacheNode(CacheNode):
+
+    def render(self, context):
+        if any(var.resolve(context) is None for var in self.vary_on):
+            return self.nodelist.render(context)
+        return super().render(context)
+
+
+@register.tag
+def fresh_cache(parser, token):
+    """{% cache %}, который не сохраняет фрагмент, если ключ содержит None.
+
+    Использование: {% fresh_cache timeout name [vary_on ...] %}.
+    """
+    nodelist = parser.parse(('endfresh_cache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{tokens[0]}' tag requires at least 2 arguments."
+        )
+    return FreshCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        tokens[2],
+        [parser.compile_filter(token) for token in tokens[3:]],
+        None,
+    )
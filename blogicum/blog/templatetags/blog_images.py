@@ -0,0 +1,10 @@
+from django import template
+
+from blog.thumbnails import image_srcset as build_srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_srcset(post):
+    return build_srcset(post.image, post.thumbnails)
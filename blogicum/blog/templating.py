@@ -0,0 +1,72 @@
+"""Бэкенд шаблонов с учётом времени рендеринга и прогрев кеша шаблонов."""
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.template import (
+    TemplateDoesNotExist,
+    TemplateSyntaxError,
+    engines,
+)
+from django.template.backends.django import (
+    DjangoTemplates,
+    Template,
+    reraise,
+)
+
+from .middleware import timed_render
+
+logger = logging.getLogger(__name__)
+
+
+class TimedTemplate(Template):
+
+    def render(self, context=None, request=None):
+        return timed_render(super().render, context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates, время рендеринга которого попадает в метрики."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def warm_templates():
+    """Компилирует все шаблоны из каталогов DIRS в кеш загрузчика.
+
+    Возвращает число загруженных шаблонов; шаблон с ошибкой пишется в лог
+    и не мешает запуску.
+    """
+    warmed = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for directory in backend.engine.dirs:
+            for path in sorted(Path(directory).rglob('*.html')):
+                name = path.relative_to(directory).as_posix()
+                try:
+                    backend.engine.get_template(name)
+                except TemplateSyntaxError:
+                    logger.exception('template %s is not compiled', name)
+                    continue
+                warmed += 1
+    return warmed
+
+
+def warm_on_startup():
+    """Прогрев шаблонов при запуске веб-сервера.
+
+    Вызывается из blogicum.wsgi и blogicum.asgi, поэтому команды
+    manage.py, кроме runserver, шаблоны не компилируют.
+    """
+    if settings.TEMPLATE_WARMUP and not settings.DEBUG:
+        warm_templates()
@@ -0,0 +1,76 @@
+"""Уменьшенные копии изображений постов для карточек и страницы поста.
+
+Копии лежат рядом с оригиналом: для post_images/photo.jpg и размера
+card это post_images/photo.card.webp (или .jpg, если WebP выключен).
+Копии создаёт фоновая задача после сохранения поста и записывает их
+ширины в Post.thumbnails, поэтому при рендеринге хранилище не трогается.
+"""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+FORMAT_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg', 'PNG': 'png'}
+
+
+def thumbnail_name(name, size_name):
+    root, extension = os.path.splitext(name)
+    if settings.THUMBNAIL_FORMAT:
+        extension = '.' + FORMAT_EXTENSIONS[settings.THUMBNAIL_FORMAT]
+    return f'{root}.{size_name}{extension}'
+
+
+def _render(image, width, image_format):
+    image.thumbnail((width, width * 4))
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, quality=80)
+    return buffer.getvalue()
+
+
+def generate_thumbnails(image_file):
+    """Создаёт копии всех размеров и возвращает их ширины по именам."""
+    storage = image_file.storage
+    widths = {}
+    with storage.open(image_file.name) as original:
+        with Image.open(original) as image:
+            image_format = settings.THUMBNAIL_FORMAT or image.format
+            # Поворот по EXIF заодно отбрасывает метаданные снимка.
+            image = ImageOps.exif_transpose(image)
+            for size_name, width in settings.THUMBNAIL_SIZES.items():
+                copy = image.copy()
+                data = _render(copy, width, image_format)
+                name = thumbnail_name(image_file.name, size_name)
+                if storage.exists(name):
+                    storage.delete(name)
+                storage.save(name, ContentFile(data))
+                widths[size_name] = copy.width
+    return widths
+
+
+def delete_thumbnails(name, storage):
+    if not name:
+        return
+    for size_name in settings.THUMBNAIL_SIZES:
+        thumbnail = thumbnail_name(name, size_name)
+        if storage.exists(thumbnail):
+            storage.delete(thumbnail)
+
+
+def image_srcset(image_file, widths):
+    """Значение атрибута srcset по ширинам готовых копий (Post.thumbnails).
+
+    Пока фоновая задача не создала копии, widths пуст и srcset не нужен.
+    """
+    if not image_file or not widths:
+        return ''
+    candidates = {}
+    for size_name, width in sorted(widths.items(), key=lambda item: item[1]):
+        candidates.setdefault(
+            width,
+            image_file.storage.url(thumbnail_name(image_file.name, size_name)),
+        )
+    return ', '.join(f'{url} {width}w' for width, url in candidates.items())
@@ -1,9 +1,21 @@
+from django.conf import settings
 from django.urls import include, path
 
-from . import views
+from . import api, async_views, feeds, views
 
 app_name = 'blog'
 
+if settings.ASYNC_VIEWS:
+    index_view = async_views.index
+    post_detail_view = async_views.post_detail
+    profile_view = async_views.profile_user
+    category_view = async_views.category_posts
+else:
+    index_view = views.PostListView.as_view()
+    post_detail_view = views.PostDetailView.as_view()
+    profile_view = views.profile_user
+    category_view = views.category_posts
+
 post_urls = [
     path(
         'create/',
@@ -17,7 +29,7 @@ post_urls = [
     ),
     path(
         '<int:post_id>/',
-        views.PostDetailView.as_view(),
+        post_detail_view,
         name='post_detail'
     ),
     path(
@@ -35,7 +47,7 @@ profile_urls = [
     ),
     path(
         '<str:username>/',
-        views.profile_user,
+        profile_view,
         name='profile'
     ),
 ]
@@ -46,6 +58,11 @@ comment_urls = [
         views.add_comment,
         name='add_comment'
     ),
+    path(
+        'more/',
+        views.comment_batch,
+        name='comment_batch'
+    ),
     path(
         '<int:comment_id>/edit_comment/',
         views.CommentUpdateView.as_view(),
@@ -58,20 +75,77 @@ comment_urls = [
     ),
 ]
 
+feed_urls = [
+    path('rss/', feeds.index_rss, name='feed'),
+    path('atom/', feeds.index_atom, name='feed_atom'),
+    path(
+        'category/<str:category_slug>/rss/',
+        feeds.category_rss,
+        name='category_feed'
+    ),
+    path(
+        'category/<str:category_slug>/atom/',
+        feeds.category_atom,
+        name='category_feed_atom'
+    ),
+    path(
+        'profile/<str:username>/rss/',
+        feeds.profile_rss,
+        name='profile_feed'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.profile_atom,
+        name='profile_feed_atom'
+    ),
+]
+
+api_urls = [
+    path('posts/', api.post_list, name='api_posts'),
+    path('posts/<int:post_id>/', api.post_detail, name='api_post'),
+    path(
+        'posts/<int:post_id>/comments/',
+        api.comment_list,
+        name='api_comments'
+    ),
+]
+
 urlpatterns = [
     path(
         '',
-        views.PostListView.as_view(),
+        index_view,
         name='index'
     ),
     path('posts/', include(post_urls)),
     path('profile/', include(profile_urls)),
     path('posts/<int:post_id>/comments/', include(comment_urls)),
+    path('feeds/', include(feed_urls)),
+    path('api/', include(api_urls)),
     path(
         'category/<str:category_slug>/',
-        views.category_posts,
+        category_view,
         name='category_posts'
     ),
+    path(
+        'search/',
+        views.search,
+        name='search'
+    ),
+    path(
+        'sitemap.xml',
+        views.sitemap,
+        name='sitemap'
+    ),
+    path(
+        'sitemap-<str:section>-<int:number>.xml',
+        views.sitemap_chunk,
+        name='sitemap_chunk'
+    ),
+    path(
+        'export/<str:kind>/',
+        views.export,
+        name='export'
+    ),
 
 
 ]
@@ -2,10 +2,16 @@ from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
 from django.urls import reverse_lazy
 from django.conf import settings
-from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -14,11 +20,47 @@ from django.views.generic import (
     UpdateView,
 )
 
-from .forms import CommentForm, PostForm, UserEditForm
+from .cache import (
+    INDEX_TAG,
+    add_cache_tags,
+    add_post_tags,
+    cache_anonymous_page,
+    category_feed_tag,
+    category_tag,
+    post_tag,
+    user_feed_tag,
+    user_tag,
+)
+from .conditional import (
+    category_validators,
+    conditional_view,
+    index_validators,
+    post_detail_validators,
+    profile_validators,
+)
+from .counting import FeedScope
+from .exporting import (
+    CONTENT_TYPES,
+    SOURCES,
+    export_lines,
+    export_queryset,
+)
+from .forms import CommentForm, ExportForm, PostForm, UserEditForm
 from .mixins import CommentMixin, OnlyAuthorMixin
 from .models import Category, Post
-from .query_utils import general_request
-from .pagination import pagination
+from .query_utils import general_request, visible_posts
+from .routers import use_replica
+from .search import search_posts
+from .sitemaps import SECTIONS, open_chunk, sitemap_index
+from .pagination import (
+    COMMENT_ORDERING,
+    CURSOR_PARAM,
+    CursorPaginator,
+    WindowedPaginator,
+    cursor_pagination,
+    pagination,
+    use_cursor,
+)
 
 User = get_user_model()
 
@@ -37,6 +79,36 @@ def add_comment(request, post_id):
     return redirect('blog:post_detail', post_id=post_id)
 
 
+def comment_page(request, post, per_page, cursor=None):
+    page = CursorPaginator(
+        post.comments.select_related('author'), per_page, COMMENT_ORDERING
+    ).get_page(cursor)
+    add_cache_tags(request, *(
+        user_tag(comment.author_id) for comment in page
+    ))
+    return page
+
+
+@cache_anonymous_page
+def comment_batch(request, post_id):
+    post = get_object_or_404(
+        visible_posts(request.user, Post.objects), id=post_id
+    )
+    add_cache_tags(request, post_tag(post.pk))
+    comments = comment_page(
+        request,
+        post,
+        settings.COMMENTS_PAGE_SIZE,
+        request.GET.get(CURSOR_PARAM),
+    )
+
+    return render(
+        request,
+        'includes/comment_list.html',
+        {'post': post, 'comments': comments}
+    )
+
+
 @login_required
 def edit_post(request, post_id):
 
@@ -57,6 +129,9 @@ def edit_post(request, post_id):
     return render(request, 'blog/create.html', context)
 
 
+@use_replica
+@cache_anonymous_page
+@conditional_view(category_validators)
 def category_posts(request, category_slug):
     category = get_object_or_404(
         Category, slug=category_slug, is_published=True
@@ -64,9 +139,14 @@ def category_posts(request, category_slug):
 
     page_obj = pagination(
         request,
-        general_request(category.posts, hidden_post=True, comments=True),
-        settings.POSTS_ON_PAGE
+        general_request(category.posts, hidden_post=True),
+        settings.POSTS_ON_PAGE,
+        scope=FeedScope('category', category.pk),
     )
+    add_cache_tags(
+        request, category_tag(category.pk), category_feed_tag(category.pk)
+    )
+    add_post_tags(request, page_obj)
 
     return render(
         request,
@@ -75,21 +155,52 @@ def category_posts(request, category_slug):
     )
 
 
+@use_replica
+@cache_anonymous_page
+@conditional_view(profile_validators)
 def profile_user(request, username):
     author = get_object_or_404(User, username=username)
+    hidden_post = author != request.user
     posts = general_request(
         model_manager=author.posts,
-        hidden_post=(author != request.user),
-        comments=True
+        hidden_post=hidden_post,
     )
 
-    page_obj = pagination(request, posts, settings.POSTS_ON_PAGE)
+    page_obj = pagination(
+        request,
+        posts,
+        settings.POSTS_ON_PAGE,
+        scope=FeedScope('author', author.pk, hidden_post),
+    )
+    add_cache_tags(request, user_tag(author.pk), user_feed_tag(author.pk))
+    add_post_tags(request, page_obj)
     context = {'profile': get_object_or_404(User, username=username)}
     context['page_obj'] = page_obj
 
     return render(request, 'blog/profile.html', context)
 
 
+@cache_anonymous_page
+def search(request):
+    query = request.GET.get('q', '').strip()
+    # Выдача упорядочена по релевантности, поэтому курсор по дате к ней
+    # не подходит.
+    page_obj = pagination(
+        request,
+        search_posts(general_request(), query),
+        settings.POSTS_ON_PAGE,
+        allow_cursor=False,
+    )
+    add_cache_tags(request, INDEX_TAG)
+    add_post_tags(request, page_obj)
+
+    return render(
+        request,
+        'blog/search.html',
+        {'query': query, 'page_obj': page_obj}
+    )
+
+
 @login_required
 def edit_profile(request):
     form = UserEditForm(request.POST or None, instance=request.user)
@@ -133,6 +244,9 @@ class PostDeleteView(OnlyAuthorMixin, DeleteView):
     success_url = reverse_lazy('blog:index')
 
 
+@method_decorator(use_replica, name='dispatch')
+@method_decorator(cache_anonymous_page, name='dispatch')
+@method_decorator(conditional_view(post_detail_validators), name='dispatch')
 class PostDetailView(DetailView):
     model = Post
     ordering = '-pub_date'
@@ -142,39 +256,91 @@ class PostDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related('author')
+        context['comments'] = comment_page(
+            self.request, self.object, settings.COMMENTS_INLINE_LIMIT
         )
+        add_post_tags(self.request, [self.object])
         return context
 
     def get_queryset(self):
-        if self.request.user.is_authenticated:
-            return super().get_queryset().filter(
-                Q(author=self.request.user)
-                | (
-                    Q(is_published=True)
-                    & Q(pub_date__lte=timezone.now())
-                    & Q(category__is_published=True)
-                )
-            )
-
-        else:
-            return general_request(
-                super().get_queryset(),
-                hidden_post=True,
-                comments=False,
-            )
+        return visible_posts(self.request.user, super().get_queryset())
 
 
+@method_decorator(use_replica, name='dispatch')
+@method_decorator(cache_anonymous_page, name='dispatch')
+@method_decorator(conditional_view(index_validators), name='dispatch')
 class PostListView(ListView):
     model = Post
     template_name = 'blog/index.html'
     paginate_by = settings.POSTS_ON_PAGE
+    paginator_class = WindowedPaginator
+
+    def paginate_queryset(self, queryset, page_size):
+        if not use_cursor(self.request):
+            return super().paginate_queryset(queryset, page_size)
+
+        page = cursor_pagination(self.request, queryset, page_size)
+        return page.paginator, page, page.object_list, page.has_other_pages()
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, scope=FeedScope('index'), **kwargs
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        add_cache_tags(self.request, INDEX_TAG)
+        add_post_tags(self.request, context['page_obj'])
+        return context
 
     def get_queryset(self):
 
         return general_request(
             super().get_queryset(),
             hidden_post=True,
-            comments=True
         )
+
+
+@staff_member_required
+def export(request, kind):
+    if kind not in SOURCES:
+        raise Http404
+    form = ExportForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+    file_format = form.cleaned_data['format'] or 'csv'
+    queryset = export_queryset(
+        kind,
+        form.cleaned_data['date_from'],
+        form.cleaned_data['date_to'],
+        form.cleaned_data['category'],
+    )
+
+    response = StreamingHttpResponse(
+        export_lines(kind, queryset, file_format),
+        content_type=CONTENT_TYPES[file_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{kind}.{file_format}"'
+    )
+    return response
+
+
+def sitemap(request):
+    return StreamingHttpResponse(
+        sitemap_index(request.build_absolute_uri('/').rstrip('/')),
+        content_type='application/xml',
+    )
+
+
+def sitemap_chunk(request, section, number):
+    if section not in SECTIONS:
+        raise Http404
+    file = open_chunk(
+        SECTIONS[section],
+        number,
+        request.build_absolute_uri('/').rstrip('/'),
+    )
+    if file is None:
+        raise Http404
+    return FileResponse(file, content_type='application/xml')
@@ -30,6 +30,7 @@ INTERNAL_IPS = [
 INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
+    'jobs.apps.JobsConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -40,6 +41,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.ViewMetricsMiddleware',
+    'blog.middleware.RenderStartedMiddleware',
+    'blog.middleware.ReplicaStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,11 +57,18 @@ ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates с учётом времени рендеринга в метриках запроса
+        'BACKEND': 'blog.templating.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
+        'APP_DIRS': False,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -65,6 +76,11 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Без DEBUG шаблоны компилируются один раз на процесс, и
+            # изменения шаблонов подхватываются только после перезапуска
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
         },
     },
 ]
@@ -77,11 +93,42 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'blogicum.sqlite_backend',
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
 
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Кеш общий для всех процессов: версии тегов, сброшенные одним воркером
+# или командой (publish_scheduled, import_blog), видны остальным, а ETag
+# совпадают между воркерами и переживают перезапуск. LocMemCache подойдёт
+# только для одного процесса без этих команд.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+# Время жизни закешированных страниц для анонимных пользователей, секунд
+PAGE_CACHE_TIMEOUT = 60 * 5
+
+
+# Сессии читаются из кеша и только при промахе из базы; без серверного
+# хранения подойдёт 'django.contrib.sessions.backends.signed_cookies'
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Пользователь сессии берётся из LRU-кеша процесса (blog.auth)
+AUTHENTICATION_BACKENDS = ['blog.auth.CachedModelBackend']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -145,3 +192,142 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 POSTS_ON_PAGE = 10
+
+# Комментарии на странице поста: сколько выводить сразу и сколько
+# подгружать за один запрос «Показать ещё»
+COMMENTS_INLINE_LIMIT = 50
+
+COMMENTS_PAGE_SIZE = 50
+
+# Число публикаций в лентах RSS и Atom
+FEED_ITEMS = 20
+
+# Наибольший размер страницы JSON API (?limit=)
+API_MAX_LIMIT = 100
+
+# Карта сайта: адресов в одной части и каталог с готовыми частями
+SITEMAP_CHUNK_SIZE = 50000
+
+SITEMAP_ROOT = BASE_DIR / 'sitemaps'
+
+# Сколько секунд хранить прежние версии частей карты сайта: их могут
+# ещё отдавать другие процессы
+SITEMAP_KEEP_STALE = 60 * 60
+
+# Keyset-пагинация лент по ?cursor= вместо ?page= (без COUNT и OFFSET)
+CURSOR_PAGINATION = False
+
+# Таймер в процессе, сбрасывающий кеш лент в момент отложенной публикации.
+# Вместо него можно запускать manage.py publish_scheduled --loop; команда
+# работает только с общим кешем (см. CACHES).
+PUBLICATION_TIMER = True
+
+# Уменьшенные копии Post.image: имя размера -> наибольшая ширина, px
+THUMBNAIL_SIZES = {
+    'card': 640,
+    'detail': 1280,
+}
+
+# Формат копий ('WEBP', 'JPEG', 'PNG') или None — как у оригинала
+THUMBNAIL_FORMAT = 'WEBP'
+
+# Очередь фоновых задач (manage.py runworker)
+JOBS_EAGER = False  # выполнять задачи сразу при постановке, без воркера
+
+JOBS_MAX_ATTEMPTS = 3
+
+JOBS_RETRY_DELAY = 30  # пауза перед первым повтором, секунд; далее вдвое
+
+JOBS_TIMEOUT = 60 * 30  # задача без завершения дольше считается зависшей
+
+# Как часто воркер возвращает в очередь зависшие задачи и удаляет старые
+# выполненные, секунд
+JOBS_MAINTENANCE_INTERVAL = 60
+
+JOBS_KEEP_DONE = 60 * 60 * 24 * 7  # сколько хранить выполненные задачи
+
+JOBS_POLL_INTERVAL = 1
+
+
+# Бюджеты представлений: число SQL-запросов и общее время ответа, мс.
+# Превышение пишется в лог blog.metrics, а при VIEW_BUDGET_RAISE
+# (включается в тестах, время — только с меткой view_time_budget)
+# вызывает blog.middleware.BudgetExceeded
+VIEW_BUDGETS = {
+    'blog:index': {'queries': 8, 'ms': 1000},
+    'blog:category_posts': {'queries': 9, 'ms': 1000},
+    'blog:profile': {'queries': 9, 'ms': 1000},
+    'blog:post_detail': {'queries': 10, 'ms': 1000},
+    'blog:add_comment': {'queries': 8, 'ms': 1000},
+    'blog:comment_batch': {'queries': 6, 'ms': 1000},
+    'blog:edit_comment': {'queries': 8, 'ms': 1000},
+    'blog:delete_comment': {'queries': 10, 'ms': 1000},
+}
+
+VIEW_BUDGET_RAISE = False
+
+# Настройки каждого нового соединения с SQLite (blogicum.sqlite_backend):
+# WAL не блокирует читателей на время записи, busy_timeout (мс) — ожидание
+# занятой базы, cache_size в КиБ со знаком минус, mmap_size в байтах
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+
+# Псевдонимы баз-реплик из DATABASES для чтения публичных страниц
+# (blog.routers.use_replica); пустой список — всё читается с default
+DATABASE_REPLICAS = []
+
+# Cookie и время в секундах, на которое пользователь после записи
+# читает с основной базы, чтобы видеть свои изменения
+REPLICA_STICKY_COOKIE = 'primary_until'
+
+REPLICA_STICKY_SECONDS = 10
+
+# Размер LRU-кеша пользователей процесса и время жизни записи, секунд:
+# изменения в обход сигналов (update()) видны не позже этого срока
+AUTH_USER_CACHE_SIZE = 1000
+
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Компилировать все шаблоны из TEMPLATES_DIR при запуске веб-сервера
+# (blogicum.wsgi, blogicum.asgi); с DEBUG кеша шаблонов нет и прогрев
+# не выполняется
+TEMPLATE_WARMUP = True
+
+# Писать в лог blog.metrics время рендеринга каждого шаблона и каждого
+# {% include %} запроса; включается для поиска дорогих фрагментов
+TEMPLATE_PROFILING = False
+
+# Число постов ленты для пагинации (blog.counting): время жизни точного
+# числа в кеше, бюджет COUNT(*) в мс, после которого берётся
+# приблизительное число, его время жизни и предел подсчёта без истории
+COUNT_CACHE_TIMEOUT = 60 * 60
+
+COUNT_TIME_BUDGET = 50
+
+COUNT_APPROXIMATE_TIMEOUT = 60
+
+COUNT_APPROXIMATE_LIMIT = 10000
+
+# Асинхронные ленты и страница поста из blog.async_views (для ASGI)
+ASYNC_VIEWS = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'blog.metrics': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
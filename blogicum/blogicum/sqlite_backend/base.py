@@ -0,0 +1,17 @@
+"""SQLite с настройками соединения из SQLITE_PRAGMAS.
+
+Режим WAL позволяет читать базу, пока идёт запись, а busy_timeout
+заставляет писателя подождать освобождения блокировки вместо ошибки
+database is locked.
+"""
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
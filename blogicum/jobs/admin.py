@@ -0,0 +1,42 @@
+from django.contrib import admin
+
+from .models import Job
+from .queue import retry_jobs
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'task',
+        'status',
+        'attempts',
+        'max_attempts',
+        'run_at',
+        'created_at',
+        'finished_at',
+    )
+    list_filter = ('status', 'task')
+    search_fields = ('task', 'last_error')
+    readonly_fields = (
+        'task',
+        'args',
+        'kwargs',
+        'status',
+        'attempts',
+        'created_at',
+        'started_at',
+        'finished_at',
+        'last_error',
+    )
+    actions = ('retry',)
+
+    @admin.action(description='Перезапустить выбранные задачи')
+    def retry(self, request, queryset):
+        retried = retry_jobs(queryset)
+        self.message_user(request, f'Поставлено в очередь: {retried}')
+
+    def has_add_permission(self, request):
+        return False
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,109 @@
+import multiprocessing
+import signal
+import time
+from multiprocessing.connection import wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from jobs.queue import claim_job, prune_jobs, requeue_stale_jobs, run_job
+
+
+def maintain():
+    """Возвращает в очередь зависшие задачи и удаляет старые выполненные."""
+    return requeue_stale_jobs(), prune_jobs()
+
+
+def work(once=False, poll_interval=None):
+    """Цикл одного воркера: забрать задачу, выполнить, повторить."""
+    poll_interval = poll_interval or settings.JOBS_POLL_INTERVAL
+    processed = 0
+    next_maintenance = time.monotonic() + settings.JOBS_MAINTENANCE_INTERVAL
+    while True:
+        close_old_connections()
+        if time.monotonic() >= next_maintenance:
+            maintain()
+            next_maintenance = (
+                time.monotonic() + settings.JOBS_MAINTENANCE_INTERVAL
+            )
+        job = claim_job()
+        if job is None:
+            if once:
+                return processed
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
+
+
+def _child(once):
+    # Соединения, унаследованные от родителя через fork, не переиспользуем.
+    connections.close_all()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    work(once=once)
+
+
+def start_worker(once):
+    worker = multiprocessing.Process(target=_child, args=(once,))
+    worker.start()
+    return worker
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задачи из очереди jobs в одном или нескольких процессах.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Число процессов-воркеров.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить готовые задачи и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        requeued, pruned = maintain()
+        if requeued:
+            self.stdout.write(f'Возвращено в очередь задач: {requeued}')
+        if pruned:
+            self.stdout.write(f'Удалено выполненных задач: {pruned}')
+
+        if options['processes'] <= 1:
+            processed = work(once=options['once'])
+            self.stdout.write(
+                self.style.SUCCESS(f'Выполнено задач: {processed}')
+            )
+            return
+
+        connections.close_all()
+        workers = [
+            start_worker(options['once'])
+            for _ in range(options['processes'])
+        ]
+        try:
+            while workers:
+                wait([worker.sentinel for worker in workers])
+                self.replace_dead(workers, options['once'])
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+
+    def replace_dead(self, workers, once):
+        """Убирает завершившиеся процессы и перезапускает упавшие."""
+        for worker in [worker for worker in workers if not worker.is_alive()]:
+            workers.remove(worker)
+            if once and worker.exitcode == 0:
+                continue
+            self.stderr.write(
+                f'Воркер {worker.pid} завершился с кодом '
+                f'{worker.exitcode}, запускаем новый.'
+            )
+            # Пауза не даёт перезапускать воркер в цикле, если он падает
+            # сразу при старте.
+            time.sleep(settings.JOBS_POLL_INTERVAL)
+            workers.append(start_worker(once))
@@ -0,0 +1,50 @@
+from django.db import models
+from django.utils import timezone
+
+MAX_TASK_NAME = 255
+
+
+class Job(models.Model):
+    """Задача, выполняемая процессом manage.py runworker."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    task = models.CharField('Задача', max_length=MAX_TASK_NAME)
+    args = models.JSONField('Аргументы', default=list, blank=True)
+    kwargs = models.JSONField('Именованные аргументы', default=dict,
+                              blank=True)
+    status = models.CharField(
+        'Состояние',
+        max_length=max(len(status) for status, _ in STATUSES),
+        choices=STATUSES,
+        default=QUEUED,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Наибольшее число попыток', default=3
+    )
+    run_at = models.DateTimeField('Запустить не раньше', default=timezone.now)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    started_at = models.DateTimeField('Запущено', null=True, blank=True)
+    finished_at = models.DateTimeField('Завершено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ('-created_at',)
+        indexes = (
+            models.Index(fields=('status', 'run_at'), name='job_queue_idx'),
+        )
+        verbose_name = 'задача'
+        verbose_name_plural = 'Задачи'
+
+    def __str__(self):
+        return f'{self.task} #{self.pk}'
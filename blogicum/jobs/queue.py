@@ -0,0 +1,139 @@
+"""Очередь фоновых задач в таблице базы данных.
+
+Функция становится задачей через декоратор @task; вызов enqueue()
+сохраняет задачу в таблицу, а процессы manage.py runworker забирают
+и выполняют её, повторяя неудачные попытки с нарастающей паузой.
+"""
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+registry = {}
+
+
+class UnknownTask(Exception):
+    pass
+
+
+def task(func):
+    """Регистрирует функцию как задачу, которую можно ставить в очередь."""
+    registry[f'{func.__module__}.{func.__qualname__}'] = func
+    return func
+
+
+def get_task(name):
+    if name not in registry:
+        # Модуль с задачей мог ещё не импортироваться в процессе воркера.
+        try:
+            import_string(name)
+        except ImportError as error:
+            raise UnknownTask(name) from error
+    if name not in registry:
+        raise UnknownTask(name)
+    return registry[name]
+
+
+def enqueue(func, *args, **kwargs):
+    """Ставит задачу в очередь; при JOBS_EAGER сразу выполняет её."""
+    name = f'{func.__module__}.{func.__qualname__}'
+    if registry.get(name) is not func:
+        raise UnknownTask(name)
+    job = Job.objects.create(
+        task=name,
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=settings.JOBS_MAX_ATTEMPTS,
+    )
+    if settings.JOBS_EAGER:
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.RUNNING, attempts=1, started_at=timezone.now()
+        )
+        job.refresh_from_db()
+        run_job(job)
+    return job
+
+
+def claim_job():
+    """Забирает ближайшую готовую к запуску задачу или возвращает None."""
+    while True:
+        now = timezone.now()
+        job = Job.objects.filter(
+            status=Job.QUEUED, run_at__lte=now
+        ).order_by('run_at', 'pk').first()
+        if job is None:
+            return None
+        # Задачу мог забрать другой воркер между SELECT и UPDATE.
+        claimed = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+            status=Job.RUNNING,
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def run_job(job):
+    try:
+        get_task(job.task)(*job.args, **job.kwargs)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + timedelta(
+                seconds=settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+    else:
+        job.status = Job.DONE
+        job.finished_at = timezone.now()
+    job.save(update_fields=('status', 'run_at', 'finished_at', 'last_error'))
+    return job
+
+
+def requeue_stale_jobs():
+    """Возвращает в очередь задачи воркеров, завершившихся аварийно.
+
+    Попытка засчитывается при захвате задачи, поэтому задача, роняющая
+    воркер, после max_attempts попыток получает статус FAILED, а не
+    перезапускается бесконечно.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        started_at__lt=now - timedelta(seconds=settings.JOBS_TIMEOUT),
+    )
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED,
+        finished_at=now,
+        last_error='Воркер не завершил задачу за JOBS_TIMEOUT секунд.',
+    )
+    return stale.update(status=Job.QUEUED, run_at=now)
+
+
+def prune_jobs():
+    """Удаляет выполненные задачи старше JOBS_KEEP_DONE секунд."""
+    deleted, _ = Job.objects.filter(
+        status=Job.DONE,
+        finished_at__lt=timezone.now() - timedelta(
+            seconds=settings.JOBS_KEEP_DONE
+        ),
+    ).delete()
+    return deleted
+
+
+def retry_jobs(queryset):
+    return queryset.exclude(status=Job.RUNNING).update(
+        status=Job.QUEUED,
+        attempts=0,
+        run_at=timezone.now(),
+        finished_at=None,
+    )
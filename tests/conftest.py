@@ -41,6 +41,43 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def enforce_view_budgets(request):
+    from django.conf import settings
+
+    budgets = settings.VIEW_BUDGETS
+    # Время ответа зависит от машины, поэтому по умолчанию проверяется
+    # только число запросов; бюджет времени — по метке view_time_budget.
+    if not request.node.get_closest_marker("view_time_budget"):
+        budgets = {
+            view: {key: value for key, value in budget.items() if key != "ms"}
+            for view, budget in budgets.items()
+        }
+    with override_settings(VIEW_BUDGET_RAISE=True, VIEW_BUDGETS=budgets):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(tmp_path):
+    from django.conf import settings
+    from django.core.cache import cache
+
+    from blog.auth import user_cache
+
+    caches = {
+        "default": {
+            **settings.CACHES["default"],
+            "LOCATION": str(tmp_path / "cache"),
+        }
+    }
+    with override_settings(CACHES=caches):
+        cache.clear()
+        user_cache.clear()
+        yield
+        cache.clear()
+        user_cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -126,6 +163,21 @@ def unlogged_client(client):
     return client
 
 
+@pytest.fixture
+def post(post_with_published_location):
+    return post_with_published_location
+
+
+def page_urls(post):
+    """Страницы, на которых виден пост: главная, пост, категория, профиль."""
+    return [
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ]
+
+
 @pytest.fixture
 def another_user_client(another_user):
     client = Client()
@@ -363,6 +415,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
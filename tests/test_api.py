@@ -0,0 +1,86 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_list_fields_and_cursor(
+        client, many_posts_with_published_locations,
+        django_assert_max_num_queries,
+):
+    with django_assert_max_num_queries(3):
+        response = client.get(
+            "/api/posts/", {"fields": "id,title", "limit": 5}
+        )
+    data = response.json()
+    assert len(data["results"]) == 5
+    assert set(data["results"][0]) == {"id", "title"}, (
+        "Убедитесь, что API возвращает только поля из `?fields=`."
+    )
+    seen = [post["id"] for post in data["results"]]
+    while data["next"]:
+        data = client.get(
+            "/api/posts/", {"fields": "id", "limit": 5, "cursor": data["next"]}
+        ).json()
+        seen.extend(post["id"] for post in data["results"])
+    assert sorted(seen) == sorted(
+        post.id for post in many_posts_with_published_locations
+    )
+
+
+def test_post_list_skips_unused_joins(client, post_with_published_location):
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/api/posts/", {"fields": "id,title,author"})
+    sql = next(
+        query["sql"] for query in queries.captured_queries
+        if "LIMIT" in query["sql"] and '"blog_post"."title"' in query["sql"]
+    )
+    assert "blog_location" not in sql, (
+        "Убедитесь, что API не присоединяет таблицы незапрошенных полей."
+    )
+    assert "auth_user" in sql
+
+
+def test_post_detail_and_visibility(
+        client, user_client, post_with_published_location,
+        unpublished_posts_with_published_locations,
+):
+    post = post_with_published_location
+    data = client.get(f"/api/posts/{post.id}/").json()
+    assert data["author"] == post.author.username
+    assert data["category"]["slug"] == post.category.slug
+    assert data["location"] == post.location.name
+
+    hidden = unpublished_posts_with_published_locations[0]
+    assert client.get(f"/api/posts/{hidden.id}/").status_code == 404
+    assert user_client.get(f"/api/posts/{hidden.id}/").status_code == 200
+    assert client.get(
+        f"/api/posts/{post.id}/", {"fields": "nope"}
+    ).status_code == 400
+
+
+def test_comments_etag(
+        client, mixer, post_with_published_location,
+        django_assert_max_num_queries,
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend(Comment, post=post)
+    url = f"/api/posts/{post.id}/comments/"
+    # Валидаторы, пост, комментарии и срок жизни записи в кеше.
+    with django_assert_max_num_queries(4):
+        response = client.get(url)
+    assert len(response.json()["results"]) == 3
+    assert response.has_header("ETag")
+    assert client.get(
+        url, HTTP_IF_NONE_MATCH=response["ETag"]
+    ).status_code == 304
+
+    mixer.blend(Comment, post=post)
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 200, (
+        "Убедитесь, что новый комментарий меняет ETag списка комментариев."
+    )
+    assert len(response.json()["results"]) == 4
@@ -0,0 +1,100 @@
+import re
+import warnings
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+
+from benchmarks.asgi import async_views
+from conftest import page_urls
+
+# Асинхронные представления ходят в базу из других потоков, поэтому данные
+# теста должны быть закоммичены.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def test_async_pages_match_sync(
+        client, post, unpublished_posts_with_published_locations
+):
+    sync_pages = {url: client.get(url).content for url in page_urls(post)}
+    with async_views():
+        for url in page_urls(post):
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f"Убедитесь, что асинхронная страница {url} доступна."
+            )
+            assert response.content == sync_pages[url], (
+                f"Убедитесь, что асинхронная страница {url} совпадает "
+                "с синхронной."
+            )
+
+
+def test_async_client_and_metrics(post):
+    client = AsyncClient()
+    with async_views():
+        for url in page_urls(post):
+            response = async_to_sync(client.get)(url)
+            assert response.status_code == 200
+            assert "queries" in response["Server-Timing"], (
+                "Убедитесь, что запросы асинхронных представлений "
+                "учитываются в Server-Timing."
+            )
+
+
+def test_async_metrics_count_sync_middleware_queries(user):
+    client = AsyncClient()
+    client.force_login(user)
+    with CaptureQueriesContext(connection) as queries:
+        response = async_to_sync(client.get)("/pages/about/")
+    counted = int(
+        re.search(r"(\d+) queries", response["Server-Timing"]).group(1)
+    )
+    # Синхронные middleware и view выполняются в потоке запроса.
+    assert queries.captured_queries
+    assert counted == len(queries.captured_queries), (
+        "Убедитесь, что в метриках асинхронного запроса учтены запросы "
+        "синхронных middleware."
+    )
+
+
+def test_async_hidden_post(client, unpublished_posts_with_published_locations):
+    hidden = unpublished_posts_with_published_locations[0]
+    with async_views():
+        assert client.get(f"/posts/{hidden.id}/").status_code == 404, (
+            "Убедитесь, что асинхронная страница скрытого поста "
+            "возвращает 404."
+        )
+        assert client.get("/category/missing/").status_code == 404
+
+
+def test_async_pages_conditional_and_cached(
+        client, post, django_assert_num_queries
+):
+    with async_views():
+        for url in page_urls(post):
+            response = client.get(url)
+            repeated = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            assert repeated.status_code == 304, (
+                f"Убедитесь, что асинхронная страница {url} отдаёт ETag."
+            )
+            with django_assert_num_queries(0):
+                assert client.get(url).content == response.content, (
+                    f"Убедитесь, что асинхронная страница {url} кешируется."
+                )
+
+
+def test_async_pages_warmed(client, post, django_assert_num_queries):
+    from blog.scheduling import warm_pages
+
+    with async_views():
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            warm_pages(page_urls(post))
+        for url in page_urls(post):
+            with django_assert_num_queries(0):
+                assert client.get(url).status_code == 200, (
+                    f"Убедитесь, что асинхронная страница {url} "
+                    "прогревается в кеше."
+                )
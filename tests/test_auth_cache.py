@@ -0,0 +1,88 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.auth import CachedModelBackend, user_cache
+from blog.cache import invalidate_tags, user_tag
+
+pytestmark = [pytest.mark.django_db]
+
+URL = "/pages/about/"
+
+
+def test_repeated_request_skips_session_and_user(user_client, user):
+    user_client.get(URL)
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(URL)
+    assert user.username in response.content.decode()
+    sql = " ".join(query["sql"] for query in queries.captured_queries)
+    assert "django_session" not in sql, (
+        "Убедитесь, что сессия читается из кеша."
+    )
+    assert "auth_user" not in sql, (
+        "Убедитесь, что пользователь сессии берётся из кеша без запросов "
+        "к базе."
+    )
+
+
+def other_process_update(user, **fields):
+    # Другой процесс меняет базу и сбрасывает тег пользователя в общем
+    # кеше; сигнал до LRU-кеша этого процесса не доходит.
+    get_user_model().objects.filter(pk=user.pk).update(**fields)
+    invalidate_tags(user_tag(user.pk))
+
+
+def test_changes_from_other_process(user_client, user):
+    user_client.get(URL)
+    other_process_update(user, is_active=False)
+    assert user.username not in user_client.get(URL).content.decode(), (
+        "Убедитесь, что заблокированный пользователь выходит из системы "
+        "без ожидания AUTH_USER_CACHE_TIMEOUT."
+    )
+
+
+def test_password_change_from_other_process(user_client, user):
+    user_client.get(URL)
+    other_process_update(user, password="changed")
+    assert user.username not in user_client.get(URL).content.decode(), (
+        "Убедитесь, что смена пароля в другом процессе завершает сессии."
+    )
+
+
+def test_user_save_invalidates(user_client, user):
+    user_client.get(URL)
+    user.username = "renamed_user"
+    user.save()
+    assert "renamed_user" in user_client.get(URL).content.decode(), (
+        "Убедитесь, что кеш пользователя сбрасывается при сохранении."
+    )
+    user.delete()
+    assert "renamed_user" not in user_client.get(URL).content.decode()
+
+
+def test_backend_returns_copies(user):
+    backend = CachedModelBackend()
+    cached = backend.get_user(user.pk)
+    cached.username = "changed_in_request"
+    again = backend.get_user(user.pk)
+    assert again is not cached
+    assert again.username == user.username, (
+        "Убедитесь, что изменения объекта из кеша не попадают в кеш."
+    )
+
+
+def test_lru_eviction(settings, mixer):
+    settings.AUTH_USER_CACHE_SIZE = 2
+    users = mixer.cycle(3).blend(get_user_model())
+    backend = CachedModelBackend()
+    for user in users:
+        backend.get_user(user.pk)
+    assert user_cache.get(users[0].pk) is None
+    assert user_cache.get(users[2].pk).pk == users[2].pk
+
+
+def test_expired_entry(settings, user):
+    settings.AUTH_USER_CACHE_TIMEOUT = -1
+    CachedModelBackend().get_user(user.pk)
+    assert user_cache.get(user.pk) is None
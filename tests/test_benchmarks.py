@@ -0,0 +1,45 @@
+import pytest
+from django.db.models import Sum
+
+from benchmarks import compare, summarize
+from benchmarks.data import generate
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+VOLUMES = dict(users=4, categories=2, locations=3, posts=30, comments=90)
+
+
+def test_generate_volumes():
+    created = generate(seed=1, **VOLUMES)
+    assert created == VOLUMES
+    assert Post.objects.count() == VOLUMES["posts"]
+    assert Comment.objects.count() == VOLUMES["comments"]
+    assert (
+        Post.objects.aggregate(total=Sum("comment_count"))["total"]
+        == VOLUMES["comments"]
+    ), "Убедитесь, что генератор пересчитывает счётчики комментариев."
+
+
+def test_generate_is_reproducible():
+    generate(seed=2, **VOLUMES)
+    first = list(Post.objects.order_by("pk").values_list("title", "text"))
+    Post.objects.all().delete()
+    generate(seed=2, **VOLUMES)
+    second = list(
+        Post.objects.order_by("pk").values_list("title", "text")
+    )
+    assert first == second, (
+        "Убедитесь, что при одинаковом seed генератор создаёт те же данные."
+    )
+
+
+def test_summary_and_compare():
+    summary = summarize([float(ms) for ms in range(1, 101)])
+    assert summary["p50_ms"] == 50.5
+    assert summary["p99_ms"] == 99.01
+    changes = compare(
+        {"paths": {"index": {"p50_ms": 15, "status": 200}}},
+        {"paths": {"index": {"p50_ms": 10, "status": 404}}},
+    )
+    assert changes == {"paths": {"index": {"p50_ms": 50.0}}}
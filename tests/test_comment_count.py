@@ -0,0 +1,46 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comment_changes(
+        mixer, post_with_published_location, post_of_another_author
+):
+    post = post_with_published_location
+    assert Post.objects.get(pk=post.pk).comment_count == 0
+
+    comments = mixer.cycle(3).blend(Comment, post=post)
+    assert Post.objects.get(pk=post.pk).comment_count == 3
+
+    comments[0].delete()
+    assert Post.objects.get(pk=post.pk).comment_count == 2
+
+    comment = Comment.objects.get(pk=comments[1].pk)
+    comment.post = post_of_another_author
+    comment.save()
+    assert Post.objects.get(pk=post.pk).comment_count == 1
+    assert Post.objects.get(pk=post_of_another_author.pk).comment_count == 1
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(4).blend(Comment, post=post)
+    Post.objects.update(comment_count=0)
+
+    call_command("recount_comments", stdout=StringIO())
+
+    assert Post.objects.get(pk=post.pk).comment_count == 4
+
+
+def test_feed_does_not_aggregate_comments(client):
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/")
+    sql = " ".join(query["sql"].upper() for query in ctx.captured_queries)
+    assert "GROUP BY" not in sql
@@ -0,0 +1,66 @@
+import pytest
+from django.test.utils import override_settings
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+INLINE_LIMIT = 5
+
+PAGE_SIZE = 4
+
+
+@pytest.fixture
+def commented_post(mixer, post_with_published_location):
+    mixer.cycle(INLINE_LIMIT + PAGE_SIZE + 2).blend(
+        Comment, post=post_with_published_location
+    )
+    return post_with_published_location
+
+
+@override_settings(
+    COMMENTS_INLINE_LIMIT=INLINE_LIMIT, COMMENTS_PAGE_SIZE=PAGE_SIZE
+)
+def test_comments_loaded_in_batches(client, commented_post):
+    response = client.get(f"/posts/{commented_post.id}/")
+    comments = response.context["comments"]
+    assert len(comments) == INLINE_LIMIT, (
+        "Убедитесь, что на странице поста сразу выводится не больше "
+        "`COMMENTS_INLINE_LIMIT` комментариев."
+    )
+    assert comments.has_next()
+    more_url = f"/posts/{commented_post.id}/comments/more/"
+    assert more_url in response.content.decode()
+
+    seen = [comment.id for comment in comments]
+    while comments.has_next():
+        response = client.get(more_url, {"cursor": comments.next_cursor})
+        assert response.status_code == 200
+        comments = response.context["comments"]
+        assert len(comments) <= PAGE_SIZE
+        seen.extend(comment.id for comment in comments)
+
+    expected = list(
+        commented_post.comments.order_by("created_at", "id")
+        .values_list("id", flat=True)
+    )
+    assert seen == expected, (
+        "Убедитесь, что подгрузка комментариев продолжает список "
+        "без пропусков и повторов."
+    )
+
+
+def test_comment_batch_hidden_post(
+        client, user_client, mixer, unpublished_posts_with_published_locations
+):
+    post = unpublished_posts_with_published_locations[0]
+    mixer.blend(Comment, post=post)
+    url = f"/posts/{post.id}/comments/more/"
+    assert client.get(url).status_code == 404, (
+        "Убедитесь, что комментарии к снятому с публикации посту "
+        "недоступны другим пользователям."
+    )
+    assert user_client.get(url).status_code == 200, (
+        "Убедитесь, что автор видит комментарии к своему неопубликованному "
+        "посту."
+    )
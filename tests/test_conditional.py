@@ -0,0 +1,86 @@
+import pytest
+
+from blog.models import Comment
+from conftest import page_urls
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_unchanged_pages_return_not_modified(client, post):
+    for url in page_urls(post):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.has_header("ETag"), (
+            f"Убедитесь, что страница {url} отдаёт заголовок ETag."
+        )
+        assert response.has_header("Last-Modified")
+        repeated = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert repeated.status_code == 304
+        repeated = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        assert repeated.status_code == 304
+
+
+def test_not_modified_skips_main_query(
+        user_client, post, django_assert_max_num_queries
+):
+    url = f"/posts/{post.id}/"
+    etag = user_client.get(url)["ETag"]
+    # Сессия, пользователь и один агрегирующий запрос валидаторов.
+    with django_assert_max_num_queries(3):
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+
+def test_changes_produce_new_etag(client, mixer, post):
+    etags = {url: client.get(url)["ETag"] for url in page_urls(post)}
+    mixer.blend(Comment, post=post)
+    for url, etag in etags.items():
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f"Убедитесь, что после нового комментария страница {url}"
+            " не отвечает 304."
+        )
+
+
+def test_commenter_rename_changes_post_etag(
+        user_client, another_user, mixer, post
+):
+    mixer.blend(Comment, post=post, author=another_user)
+    url = f"/posts/{post.id}/"
+    etag = user_client.get(url)["ETag"]
+    another_user.username = "renamed_commenter"
+    another_user.save()
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что после переименования автора комментария страница "
+        "поста не отвечает 304."
+    )
+    assert "renamed_commenter" in response.content.decode()
+
+
+def test_validators_respect_visibility(
+        user_client, client, another_user_client, post
+):
+    post.is_published = False
+    post.save()
+    url = f"/posts/{post.id}/"
+    etag = user_client.get(url)["ETag"]
+    for other_client in (client, another_user_client):
+        response = other_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 404
+
+
+def test_process_local_cache_disables_validators(client, settings, post):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+    response = client.get("/")
+    assert response.status_code == 200
+    assert not response.has_header("ETag"), (
+        "Убедитесь, что без общего кеша ETag не выдаётся: версии тегов "
+        "в разных процессах различаются."
+    )
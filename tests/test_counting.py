@@ -0,0 +1,141 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import counting
+from blog.cache import INDEX_TAG, invalidate_tags
+from blog.counting import (
+    FeedScope,
+    feed_count,
+    store_exact_count,
+    timed_count,
+)
+from blog.pagination import WindowedPaginator
+from blog.tasks import refresh_feed_count
+from jobs.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(many_posts_with_published_locations):
+    return many_posts_with_published_locations
+
+
+@pytest.fixture
+def over_budget(monkeypatch, settings):
+    # Бюджет проверяется на каждой инструкции SQLite и сразу исчерпан.
+    monkeypatch.setattr(counting, "PROGRESS_STEPS", 1)
+    settings.COUNT_TIME_BUDGET = 0
+
+
+def count_queries(queries):
+    return [
+        query for query in queries.captured_queries
+        if any(
+            aggregate in query["sql"].upper()
+            for aggregate in ("COUNT(", "MAX(", "SUM(")
+        )
+    ]
+
+
+def test_count_cached_between_requests(user_client, posts):
+    user_client.get("/")
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get("/")
+    assert response.context["paginator"].count == len(posts)
+    assert not count_queries(queries), (
+        "Убедитесь, что число постов ленты берётся из кеша, а лента "
+        "не агрегируется целиком."
+    )
+
+
+def test_count_invalidated_by_signals(user_client, posts):
+    user_client.get("/")
+    post = posts[0]
+    post.is_published = False
+    post.save()
+    response = user_client.get("/")
+    assert response.context["paginator"].count == len(posts) - 1, (
+        "Убедитесь, что кеш числа постов сбрасывается при изменении постов."
+    )
+    category = post.category
+    response = user_client.get(f"/category/{category.slug}/")
+    assert response.context["page_obj"].paginator.count == (
+        FeedScope("category", category.pk).queryset.count()
+    )
+
+
+def test_timed_count_interrupted(posts, over_budget):
+    scope = FeedScope("index")
+    assert timed_count(scope.queryset, 0) is None
+    assert timed_count(scope.queryset, None) == len(posts)
+    assert scope.queryset.count() == len(posts), (
+        "Убедитесь, что после прерывания соединение работает."
+    )
+
+
+def test_approximate_count_and_refresh(posts, over_budget):
+    scope = FeedScope("index")
+    assert feed_count(scope) == (len(posts), True)
+    refreshes = Job.objects.filter(task__endswith="refresh_feed_count")
+    assert refreshes.count() == 1
+    feed_count(scope)
+    assert refreshes.count() == 1, (
+        "Убедитесь, что точный подсчёт ставится в очередь один раз."
+    )
+    refresh_feed_count("index")
+    assert feed_count(scope) == (len(posts), False)
+
+
+def test_approximate_uses_last_exact(posts, over_budget):
+    scope = FeedScope("index")
+    store_exact_count(scope, 3)
+    cache.delete(scope.cache_key())
+    count, approximate = feed_count(scope)
+    assert (count, approximate) == (3, True)
+
+    paginator = WindowedPaginator(scope.queryset, 2, scope=scope)
+    assert paginator.num_pages == 2
+    last = paginator.get_page(paginator.num_pages)
+    assert len(last) == 2 and last.has_next(), (
+        "Убедитесь, что приблизительное число не обрезает страницу и "
+        "ссылка на следующую страницу есть, пока есть посты."
+    )
+    assert paginator.num_pages == 3, (
+        "Убедитесь, что число страниц не меньше открытой страницы."
+    )
+    beyond = paginator.get_page(3)
+    assert beyond.number == 3 and len(beyond) == 2, (
+        "Убедитесь, что страницы за приблизительным концом ленты доступны."
+    )
+
+
+def test_approximate_last_page_clamped(posts, over_budget):
+    scope = FeedScope("index")
+    # Последнее точное число больше настоящего.
+    store_exact_count(scope, len(posts) * 10)
+    cache.delete(scope.cache_key())
+    last_number = (len(posts) + 1) // 2
+    paginator = WindowedPaginator(scope.queryset, 2, scope=scope)
+    last = paginator.get_page(last_number)
+    assert not last.has_next() and paginator.num_pages == last_number, (
+        "Убедитесь, что на последней странице ленты нет ссылки дальше."
+    )
+    fallback = WindowedPaginator(scope.queryset, 2, scope=scope).get_page(
+        10_000
+    )
+    assert len(fallback) > 0, (
+        "Убедитесь, что за концом ленты открывается непустая страница."
+    )
+
+
+def test_last_exact_dropped_on_invalidation(posts, over_budget):
+    scope = FeedScope("index")
+    store_exact_count(scope, 3)
+    invalidate_tags(INDEX_TAG)
+    assert feed_count(scope) == (len(posts), True), (
+        "Убедитесь, что последнее точное число ленты не используется "
+        "после её изменения."
+    )
@@ -0,0 +1,67 @@
+import csv
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def export_data(mixer, user, published_category, published_location):
+    now = timezone.now()
+    old, new = mixer.cycle(2).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=(now - timedelta(days=days) for days in (30, 1)),
+    )
+    mixer.blend(Comment, post=new, author=user)
+    return old, new
+
+
+def test_export_command_csv(export_data, published_category):
+    old, new = export_data
+    out = StringIO()
+    call_command(
+        "export_blog", "posts", "--category", published_category.slug,
+        "--from", str((timezone.now() - timedelta(days=7)).date()),
+        stdout=out,
+    )
+    rows = list(csv.DictReader(StringIO(out.getvalue())))
+    assert [int(row["id"]) for row in rows] == [new.id], (
+        "Убедитесь, что выгрузка фильтруется по периоду и категории."
+    )
+    assert rows[0]["location"] == new.location.name
+    assert rows[0]["author"] == new.author.username
+
+
+def test_export_view_streams_jsonl(admin_client, export_data):
+    response = admin_client.get(
+        "/export/comments/", {"format": "jsonl"}
+    )
+    assert response.status_code == 200
+    assert response.streaming, (
+        "Убедитесь, что выгрузка отдаётся через StreamingHttpResponse."
+    )
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    record = json.loads(lines[0])
+    assert record["post"] == export_data[1].id
+    assert record["category"] == export_data[1].category.slug
+
+
+def test_export_view_staff_only(user_client, admin_client):
+    response = user_client.get("/export/posts/")
+    assert response.status_code == 302, (
+        "Убедитесь, что выгрузка доступна только персоналу."
+    )
+    assert admin_client.get("/export/users/").status_code == 404
+    assert admin_client.get(
+        "/export/posts/", {"date_from": "2024-02-01", "date_to": "2024-01-01"}
+    ).status_code == 400
@@ -0,0 +1,61 @@
+import pytest
+from xml.etree import ElementTree
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def feed_urls(post):
+    return [
+        "/feeds/rss/",
+        "/feeds/atom/",
+        f"/feeds/category/{post.category.slug}/rss/",
+        f"/feeds/category/{post.category.slug}/atom/",
+        f"/feeds/profile/{post.author.username}/rss/",
+        f"/feeds/profile/{post.author.username}/atom/",
+    ]
+
+
+def test_feeds_list_visible_posts(
+        client, post, unpublished_posts_with_published_locations
+):
+    hidden = unpublished_posts_with_published_locations[0]
+    for url in feed_urls(post):
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f"Убедитесь, что лента {url} доступна."
+        )
+        content = response.content.decode()
+        assert f"/posts/{post.id}/" in content
+        assert f"/posts/{hidden.id}/" not in content, (
+            f"Убедитесь, что в ленту {url} не попадают скрытые публикации."
+        )
+    rss = ElementTree.fromstring(client.get(feed_urls(post)[0]).content)
+    assert rss.find("channel/item/title").text == post.title
+
+
+def test_feed_conditional_and_cached(
+        client, post, django_assert_num_queries
+):
+    for url in feed_urls(post):
+        response = client.get(url)
+        repeated = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert repeated.status_code == 304
+        repeated = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        assert repeated.status_code == 304
+        with django_assert_num_queries(0):
+            assert client.get(url).content == response.content
+
+
+def test_feed_invalidated_on_post_change(client, post):
+    contents = {url: client.get(url).content for url in feed_urls(post)}
+    post = Post.objects.get(pk=post.pk)
+    post.title = "Новый заголовок ленты"
+    post.save()
+    for url, content in contents.items():
+        assert "Новый заголовок ленты" in client.get(url).content.decode(), (
+            f"Убедитесь, что лента {url} обновляется после правки поста."
+        )
@@ -0,0 +1,146 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def archive(tmp_path, user, published_category, published_location):
+    records = [
+        {
+            "type": "post",
+            "id": 501,
+            "title": "Архивный пост",
+            "text": "Текст",
+            "pub_date": "2020-01-02T10:00:00",
+            "author": user.username,
+            "category": published_category.slug,
+            "location": published_location.name,
+        },
+        {
+            "type": "post",
+            "id": 502,
+            "title": "Без местоположения",
+            "text": "Текст",
+            "pub_date": "2020-01-03T10:00:00",
+            "created_at": "2019-12-31T09:00:00",
+            "author": user.username,
+            "is_published": False,
+        },
+    ] + [
+        {
+            "type": "comment",
+            "post": 501,
+            "text": f"Комментарий {i}",
+            "author": user.username,
+            "created_at": f"2020-01-0{i + 2}T12:00:00",
+        }
+        for i in range(3)
+    ]
+    path = tmp_path / "archive.jsonl"
+    path.write_text(
+        "\n".join(json.dumps(record, ensure_ascii=False) for record in records),
+        encoding="utf-8",
+    )
+    return path
+
+
+def test_import_jsonl(archive):
+    out = StringIO()
+    call_command(
+        "import_blog", str(archive), "--chunk-size", "2", stdout=out
+    )
+    assert "строк/с" in out.getvalue()
+
+    post = Post.objects.get(pk=501)
+    assert post.location is not None and post.category is not None
+    assert post.comment_count == 3, (
+        "Убедитесь, что после загрузки пересчитываются счётчики комментариев."
+    )
+    hidden = Post.objects.get(pk=502)
+    assert not hidden.is_published
+    assert hidden.created_at.year == 2019, (
+        "Убедитесь, что дата создания берётся из архива."
+    )
+    assert list(
+        Comment.objects.order_by("created_at").values_list("text", flat=True)
+    ) == [f"Комментарий {i}" for i in range(3)]
+
+
+def test_import_csv(tmp_path, user, published_category):
+    path = tmp_path / "posts.csv"
+    path.write_text(
+        "type,title,text,pub_date,created_at,author,category,location\n"
+        f"post,Из CSV,Текст,2021-05-01T08:00:00,2021-04-30T08:00:00,"
+        f"{user.username},{published_category.slug},\n",
+        encoding="utf-8",
+    )
+    call_command("import_blog", str(path), stdout=StringIO())
+    post = Post.objects.get(title="Из CSV")
+    assert post.location is None
+    assert post.created_at.date().isoformat() == "2021-04-30", (
+        "Убедитесь, что дата создания из архива сохраняется и для постов "
+        "без id."
+    )
+    assert Post._meta.get_field("created_at").auto_now_add
+
+
+def test_import_invalidates_pages_not_cache(client, archive):
+    cache.set("unrelated", "kept")
+    client.get("/")
+    call_command("import_blog", str(archive), stdout=StringIO())
+    assert cache.get("unrelated") == "kept", (
+        "Убедитесь, что загрузка не очищает весь кеш."
+    )
+    assert "Архивный пост" in client.get("/").content.decode(), (
+        "Убедитесь, что загрузка сбрасывает кеш затронутых страниц."
+    )
+
+
+def test_import_recounts_only_commented_posts(
+        archive, post_with_published_location
+):
+    other = post_with_published_location
+    Post.objects.filter(pk=other.pk).update(comment_count=7)
+    call_command("import_blog", str(archive), stdout=StringIO())
+    assert Post.objects.get(pk=501).comment_count == 3
+    assert Post.objects.get(pk=other.pk).comment_count == 7, (
+        "Убедитесь, что после загрузки пересчитываются счётчики только "
+        "постов, к которым добавлены комментарии."
+    )
+
+
+def test_import_invalid_records(tmp_path, user):
+    path = tmp_path / "broken.jsonl"
+    path.write_text(
+        "\n".join((
+            json.dumps({"type": "post", "title": "Есть", "text": "Текст",
+                        "author": user.username}),
+            json.dumps({"type": "post", "title": "Нет автора",
+                        "text": "Текст", "author": "nobody"}),
+            "{не json",
+            json.dumps({"type": "comment", "post": 999, "text": "Текст",
+                        "author": user.username}),
+        )),
+        encoding="utf-8",
+    )
+    with pytest.raises(CommandError, match="строка 2"):
+        call_command("import_blog", str(path), stdout=StringIO())
+    assert not Post.objects.exists(), (
+        "Убедитесь, что порция с ошибкой не сохраняется частично."
+    )
+
+    err = StringIO()
+    call_command(
+        "import_blog", str(path), "--skip-invalid",
+        stdout=StringIO(), stderr=err,
+    )
+    assert Post.objects.count() == 1
+    assert not Comment.objects.exists()
+    assert err.getvalue().count("Пропущено") == 3
@@ -0,0 +1,89 @@
+import re
+
+import pytest
+from django.conf import settings
+
+from blog.pagination import COMMENT_ORDERING, FEED_ORDERING, CursorPaginator
+from blog.query_utils import general_request
+
+pytestmark = [pytest.mark.django_db]
+
+FULL_SCAN = re.compile(r"\bSCAN (blog_post|blog_category)\b(?! USING)")
+TEMP_SORT = re.compile(r"USE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY")
+
+
+@pytest.fixture
+def feed_data(mixer, user, another_user):
+    categories = mixer.cycle(5).blend("blog.Category", is_published=True)
+    mixer.cycle(60).blend(
+        "blog.Post",
+        author=mixer.sequence(user, another_user),
+        category=mixer.sequence(*categories),
+    )
+    return categories
+
+
+def feed_querysets(user, category):
+    return {
+        "главная": general_request(),
+        "категория": general_request(category.posts),
+        "профиль": general_request(user.posts),
+        "свой профиль": general_request(user.posts, hidden_post=False),
+    }
+
+
+def assert_uses_indexes(name, queryset):
+    plan = queryset.explain()
+    assert not FULL_SCAN.search(plan), (
+        f"Запрос ленты «{name}» выполняет полный просмотр таблицы:\n{plan}"
+    )
+    assert not TEMP_SORT.search(plan), (
+        f"Запрос ленты «{name}» сортирует результат во временном B-дереве"
+        f" вместо чтения индекса:\n{plan}"
+    )
+    assert "USING INDEX post_" in plan, (
+        f"Запрос ленты «{name}» не использует индексы ленты:\n{plan}"
+    )
+
+
+def test_feed_queries_use_indexes(feed_data, user):
+    for name, queryset in feed_querysets(user, feed_data[0]).items():
+        assert_uses_indexes(
+            name, queryset.order_by(*FEED_ORDERING)[:settings.POSTS_ON_PAGE]
+        )
+
+
+def test_cursor_queries_use_indexes(feed_data, user):
+    for name, queryset in feed_querysets(user, feed_data[0]).items():
+        paginator = CursorPaginator(queryset, settings.POSTS_ON_PAGE)
+        last_post = paginator.page().object_list[-1]
+        _, values = paginator.decode_cursor(
+            paginator.encode_cursor(last_post, "n")
+        )
+        assert_uses_indexes(
+            name,
+            queryset.order_by(*FEED_ORDERING).filter(
+                paginator._seek(FEED_ORDERING, values)
+            )[:settings.POSTS_ON_PAGE + 1],
+        )
+
+
+def test_comment_pages_use_index(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(30).blend("blog.Comment", post=post)
+    paginator = CursorPaginator(post.comments.all(), 10, COMMENT_ORDERING)
+    _, values = paginator.decode_cursor(
+        paginator.encode_cursor(paginator.page().object_list[-1], "n")
+    )
+    for queryset in (
+        post.comments.order_by(*COMMENT_ORDERING),
+        post.comments.order_by(*COMMENT_ORDERING).filter(
+            paginator._seek(COMMENT_ORDERING, values)
+        ),
+    ):
+        plan = queryset[:11].explain()
+        assert not TEMP_SORT.search(plan), (
+            "Страница комментариев сортируется во временном B-дереве "
+            f"вместо чтения индекса:\n{plan}"
+        )
+        assert "comment_post_page_idx" in plan, plan
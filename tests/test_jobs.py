@@ -0,0 +1,121 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import (
+    UnknownTask,
+    claim_job,
+    enqueue,
+    prune_jobs,
+    requeue_stale_jobs,
+    run_job,
+    task,
+)
+
+pytestmark = [pytest.mark.django_db]
+
+calls = []
+
+
+@task
+def remember(value, suffix=""):
+    calls.append(f"{value}{suffix}")
+
+
+@task
+def explode():
+    raise RuntimeError("boom")
+
+
+def test_enqueue_stores_job_until_worker_runs():
+    calls.clear()
+    job = enqueue(remember, "a", suffix="!")
+    assert Job.objects.get(pk=job.pk).status == Job.QUEUED
+    assert calls == []
+
+    call_command("runworker", "--once", stdout=StringIO())
+
+    assert calls == ["a!"]
+    job.refresh_from_db()
+    assert job.status == Job.DONE
+    assert job.attempts == 1
+    assert job.finished_at is not None
+
+
+def test_failed_job_is_retried_with_backoff_then_failed(settings):
+    job = enqueue(explode)
+    for attempt in range(1, job.max_attempts + 1):
+        claimed = claim_job()
+        assert claimed.pk == job.pk
+        run_job(claimed)
+        job.refresh_from_db()
+        assert job.attempts == attempt
+        assert "RuntimeError: boom" in job.last_error
+        if attempt < job.max_attempts:
+            assert job.status == Job.QUEUED
+            assert job.run_at > timezone.now()
+            assert claim_job() is None, (
+                "Повтор задачи не должен запускаться раньше паузы."
+            )
+            Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+    assert job.status == Job.FAILED
+
+
+def test_stale_running_jobs_are_requeued(settings):
+    job = enqueue(remember, "b")
+    claim_job()
+    Job.objects.filter(pk=job.pk).update(
+        started_at=timezone.now() - timedelta(seconds=settings.JOBS_TIMEOUT + 1)
+    )
+    call_command("runworker", "--once", stdout=StringIO())
+    job.refresh_from_db()
+    assert job.status == Job.DONE
+
+
+def test_job_crashing_worker_fails_after_max_attempts(settings):
+    job = enqueue(remember, "c")
+    stale = timezone.now() - timedelta(seconds=settings.JOBS_TIMEOUT + 1)
+    for _ in range(job.max_attempts):
+        assert claim_job().pk == job.pk
+        # Воркер упал посреди задачи и не записал её результат.
+        Job.objects.filter(pk=job.pk).update(started_at=stale)
+        requeue_stale_jobs()
+    job.refresh_from_db()
+    assert job.status == Job.FAILED, (
+        "Убедитесь, что задача, роняющая воркер, не перезапускается "
+        "больше max_attempts раз."
+    )
+    assert claim_job() is None
+
+
+def test_old_done_jobs_are_pruned(settings):
+    old, recent, failed = (enqueue(remember, value) for value in "xyz")
+    Job.objects.filter(pk__in=(old.pk, recent.pk)).update(
+        status=Job.DONE, finished_at=timezone.now()
+    )
+    Job.objects.filter(pk=failed.pk).update(status=Job.FAILED)
+    Job.objects.filter(pk__in=(old.pk, failed.pk)).update(
+        finished_at=timezone.now() - timedelta(
+            seconds=settings.JOBS_KEEP_DONE + 1
+        )
+    )
+    assert prune_jobs() == 1
+    assert set(Job.objects.values_list("pk", flat=True)) == {
+        recent.pk, failed.pk
+    }, "Убедитесь, что удаляются только давно выполненные задачи."
+
+
+def test_only_registered_tasks_can_be_enqueued():
+    with pytest.raises(UnknownTask):
+        enqueue(print, "x")
+
+
+def test_admin_lists_jobs(admin_client):
+    enqueue(explode)
+    response = admin_client.get("/admin/jobs/job/?status__exact=queued")
+    assert response.status_code == 200
+    assert "test_jobs.explode" in response.content.decode()
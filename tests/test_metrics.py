@@ -0,0 +1,116 @@
+import json
+import logging
+
+import pytest
+from django.test.utils import override_settings
+
+from blog.middleware import BudgetExceeded, logger
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def metrics_records(monkeypatch, caplog):
+    monkeypatch.setattr(logger, "propagate", True)
+    caplog.set_level(logging.INFO, logger="blog.metrics")
+    return caplog
+
+
+def test_server_timing_and_log(
+        client, metrics_records, post_with_published_location
+):
+    response = client.get(f"/posts/{post_with_published_location.id}/")
+    timing = response["Server-Timing"]
+    for metric in ("db;dur=", "tpl;dur=", "total;dur="):
+        assert metric in timing, (
+            "Убедитесь, что ответ содержит заголовок `Server-Timing` "
+            "с временем базы, шаблонов и общим временем."
+        )
+    record = json.loads(metrics_records.records[-1].getMessage())
+    assert record["view"] == "blog:post_detail"
+    assert record["status"] == 200
+    assert record["queries"] > 0
+    assert record["template_ms"] > 0
+    assert record["total_ms"] >= record["db_ms"]
+
+
+@override_settings(
+    VIEW_BUDGETS={"blog:index": {"queries": 0}}, VIEW_BUDGET_RAISE=True
+)
+def test_budget_raises(client, post_with_published_location):
+    with pytest.raises(BudgetExceeded):
+        client.get("/")
+
+
+@override_settings(
+    VIEW_BUDGETS={"blog:index": {"queries": 0}}, VIEW_BUDGET_RAISE=False
+)
+def test_budget_logged(client, metrics_records, post_with_published_location):
+    response = client.get("/")
+    assert response.status_code == 200
+    warnings = [
+        record for record in metrics_records.records
+        if record.levelno == logging.WARNING
+    ]
+    assert warnings and "blog:index" in warnings[0].getMessage(), (
+        "Убедитесь, что превышение бюджета представления пишется в лог."
+    )
+
+
+def test_time_budgets_are_opt_in(settings):
+    assert all("ms" not in budget for budget in settings.VIEW_BUDGETS.values())
+
+
+@pytest.mark.view_time_budget
+def test_time_budgets_with_marker(settings):
+    assert any("ms" in budget for budget in settings.VIEW_BUDGETS.values()), (
+        "Убедитесь, что метка view_time_budget включает бюджеты времени."
+    )
+
+
+@override_settings(TEMPLATE_PROFILING=True)
+def test_template_profile(
+        client, metrics_records, many_posts_with_published_locations
+):
+    client.get("/")
+    record = json.loads(metrics_records.records[-1].getMessage())
+    assert record["view"] == "blog:index"
+    profile = {entry["template"]: entry for entry in record["templates"]}
+    assert "template blog/index.html" in profile
+    assert "template base.html" in profile, (
+        "Убедитесь, что профиль учитывает родительские шаблоны."
+    )
+    card = profile["include includes/post_card.html"]
+    assert card["calls"] == 10, (
+        "Убедитесь, что профиль считает каждый {% include %}."
+    )
+    assert card["total_ms"] >= card["self_ms"] > 0
+    assert profile["template blog/index.html"]["total_ms"] >= sum(
+        entry["self_ms"] for entry in record["templates"]
+    ) - 1
+
+
+def test_templates_warmed():
+    from django.template import engines
+
+    from blog.templating import warm_templates
+
+    assert warm_templates() >= 30
+    loader = engines["django"].engine.template_loaders[0]
+    assert "includes/paginator.html" in {
+        key.split("-")[0] for key in loader.get_template_cache
+    }, "Убедитесь, что шаблоны попадают в кеш загрузчика."
+
+
+@pytest.mark.parametrize("debug, warmed", [(False, True), (True, False)])
+def test_warm_on_startup(settings, monkeypatch, debug, warmed):
+    from blog import templating
+
+    calls = []
+    monkeypatch.setattr(templating, "warm_templates", lambda: calls.append(1))
+    settings.DEBUG = debug
+    templating.warm_on_startup()
+    assert bool(calls) is warmed, (
+        "Убедитесь, что шаблоны прогреваются при запуске сервера только "
+        "без DEBUG."
+    )
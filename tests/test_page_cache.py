@@ -0,0 +1,142 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+
+from blog.cache import add_cache_tags, cache_anonymous_page, invalidate_tags
+from blog.models import Comment
+from conftest import page_urls
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_pages_are_served_from_cache(
+        client, post, django_assert_num_queries
+):
+    for url in page_urls(post):
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.status_code == 200
+        assert second.content == first.content, (
+            f"Убедитесь, что страница {url} отдаётся анонимам из кеша."
+        )
+
+
+def test_logged_in_pages_are_not_cached(user_client, post):
+    user_client.get("/")
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in user_client.get("/").content.decode()
+
+
+def test_post_edit_evicts_its_pages(client, post):
+    for url in page_urls(post):
+        client.get(url)
+    post.title = "Отредактированный заголовок"
+    post.save()
+    for url in page_urls(post):
+        assert "Отредактированный заголовок" in (
+            client.get(url).content.decode()
+        ), f"Убедитесь, что после правки поста страница {url} обновилась."
+
+
+def test_comment_evicts_comment_count(client, mixer, post):
+    for url in page_urls(post):
+        client.get(url)
+    mixer.blend(Comment, post=post, text="Свежий комментарий")
+    for url in page_urls(post):
+        content = client.get(url).content.decode()
+        if url == f"/posts/{post.id}/":
+            assert "Свежий комментарий" in content
+        else:
+            assert "Комментарии (1)" in content
+
+
+def test_related_objects_evict_pages(client, post):
+    for url in page_urls(post):
+        client.get(url)
+    post.location.name = "Новое место"
+    post.location.save()
+    post.author.username = "renamed_author"
+    post.author.save()
+    for url in page_urls(post)[:3]:
+        content = client.get(url).content.decode()
+        assert "Новое место" in content
+        assert "@renamed_author" in content
+
+
+def test_unrelated_changes_keep_cache(
+        client, post, post_of_another_author, mixer,
+        django_assert_num_queries
+):
+    url = f"/posts/{post.id}/"
+    client.get(url)
+    post_of_another_author.title = "Другой пост"
+    post_of_another_author.save()
+    mixer.blend("blog.Category")
+    with django_assert_num_queries(0):
+        client.get(url)
+
+
+def test_post_card_fragment_follows_edits(user_client, mixer, post):
+    user_client.get("/")
+    post.location.name = "Другое место"
+    post.location.save()
+    mixer.blend(Comment, post=post)
+    content = user_client.get("/").content.decode()
+    assert "Другое место" in content, (
+        "Убедитесь, что кеш карточки поста сбрасывается при правке"
+        " местоположения."
+    )
+    assert "Комментарии (1)" in content
+
+
+def test_page_invalidated_during_render_is_not_cached(rf):
+    @cache_anonymous_page
+    def view(request):
+        content = str(calls)
+        calls.append(request)
+        add_cache_tags(request, "index")
+        if len(calls) == 1:
+            # Пост сохранён, пока страница собиралась из старых данных.
+            invalidate_tags("index")
+        return HttpResponse(content)
+
+    def get():
+        request = rf.get("/")
+        request.user = AnonymousUser()
+        return view(request).content
+
+    calls = []
+    assert get() == b"[]"
+    get()
+    get()
+    assert len(calls) == 2, (
+        "Убедитесь, что страница, теги которой сброшены во время рендера, "
+        "не попадает в кеш, а следующая — попадает."
+    )
+
+
+def test_card_changed_during_request_not_cached(post):
+    from django.template.loader import render_to_string
+
+    from blog.cache import begin_render, end_render, post_tag
+
+    token = begin_render()
+    try:
+        # Пост выбран до правки, которая случилась во время запроса.
+        invalidate_tags(post_tag(post.id))
+        post.title = "Заголовок до правки"
+        render_to_string("includes/post_card.html", {"post": post})
+    finally:
+        end_render(token)
+    post.title = "Заголовок после правки"
+    token = begin_render()
+    try:
+        card = render_to_string("includes/post_card.html", {"post": post})
+    finally:
+        end_render(token)
+    assert "Заголовок после правки" in card, (
+        "Убедитесь, что карточка, данные которой изменились во время "
+        "запроса, не попадает в кеш фрагментов."
+    )
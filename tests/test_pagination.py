@@ -0,0 +1,144 @@
+import base64
+import json
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.pagination import WindowedPaginator
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    now = timezone.now()
+    # Пары постов с одинаковой датой проверяют сортировку по id.
+    pub_dates = (
+        now - timedelta(hours=i // 2) for i in range(1, N_PER_PAGE * 2 + 6)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_dates,
+    )
+
+
+def _walk(client, url):
+    seen = []
+    response = client.get(url, {"cursor": ""})
+    page_obj = response.context["page_obj"]
+    assert not page_obj.has_previous()
+    pages = [page_obj]
+    seen.extend(post.id for post in page_obj)
+    while page_obj.has_next():
+        response = client.get(url, {"cursor": page_obj.next_cursor})
+        page_obj = response.context["page_obj"]
+        pages.append(page_obj)
+        seen.extend(post.id for post in page_obj)
+    return seen, pages
+
+
+@pytest.mark.parametrize("url_name", ["index", "category", "profile"])
+def test_cursor_pagination_walks_whole_feed(
+        client, feed_posts, user, published_category, url_name
+):
+    url = {
+        "index": "/",
+        "category": f"/category/{published_category.slug}/",
+        "profile": f"/profile/{user.username}/",
+    }[url_name]
+    seen, pages = _walk(client, url)
+    expected = [
+        post.id for post in sorted(
+            feed_posts, key=lambda post: (post.pub_date, post.id),
+            reverse=True
+        )
+    ]
+    assert seen == expected, (
+        "Убедитесь, что курсорная пагинация выдаёт все посты ленты ровно"
+        " один раз и в порядке убывания даты публикации."
+    )
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE, 5]
+
+    last_page = pages[-1]
+    response = client.get(url, {"cursor": last_page.previous_cursor})
+    assert [post.id for post in response.context["page_obj"]] == (
+        [post.id for post in pages[-2]]
+    ), "Убедитесь, что ссылка на предыдущую страницу возвращает её же посты."
+    assert "?cursor=" in response.content.decode("utf-8")
+
+
+def test_invalid_cursor_falls_back_to_first_page(client, feed_posts):
+    response = client.get("/", {"cursor": "not-a-cursor"})
+    assert response.status_code == 200
+    page_obj = response.context["page_obj"]
+    assert len(page_obj) == N_PER_PAGE
+    assert not page_obj.has_previous()
+
+
+@pytest.mark.parametrize("url", ["/", "/api/posts/"])
+def test_out_of_range_cursor_falls_back(client, feed_posts, url):
+    raw = json.dumps(["n", [timezone.now().isoformat(), "9" * 23]])
+    cursor = base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+    response = client.get(url, {"cursor": cursor})
+    assert response.status_code == 200, (
+        "Убедитесь, что курсор с числом вне диапазона столбца "
+        "не приводит к ошибке сервера."
+    )
+
+
+def test_cursor_query_skips_count_and_offset(client, feed_posts):
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/", {"cursor": ""})
+    sql = " ".join(query["sql"].upper() for query in ctx.captured_queries)
+    for aggregate in ("COUNT(", "MAX(", "SUM("):
+        assert aggregate not in sql, (
+            "Убедитесь, что страница с курсором не агрегирует всю ленту."
+        )
+    assert "OFFSET" not in sql
+
+
+def test_page_window_is_bounded():
+    paginator = WindowedPaginator(range(50_000 * N_PER_PAGE), N_PER_PAGE)
+    for number in (1, 2, 25_000, 49_999, 50_000):
+        window = paginator.page(number).page_window
+        assert len(window) <= 11, (
+            "Убедитесь, что число ссылок пагинатора не зависит от размера "
+            "ленты."
+        )
+        assert number in window
+        assert 1 in window and 50_000 in window
+    assert paginator.page(25_000).page_window == [
+        1, paginator.ELLIPSIS, *range(24_997, 25_004),
+        paginator.ELLIPSIS, 50_000,
+    ]
+
+
+def test_given_count_skips_count_query(django_assert_num_queries):
+    from blog.models import Post
+
+    paginator = WindowedPaginator(Post.objects.order_by("pk"), 10, count=95)
+    with django_assert_num_queries(0):
+        assert paginator.num_pages == 10
+
+
+def test_paginator_template_window(client, feed_posts, settings):
+    settings.POSTS_ON_PAGE = 1
+    category = feed_posts[0].category
+    response = client.get(f"/category/{category.slug}/", {"page": 12})
+    content = response.content.decode()
+    total = len(feed_posts)
+    for number in (1, 9, 15, total):
+        assert f'href="?page={number}"' in content
+    assert 'href="?page=8"' not in content, (
+        "Убедитесь, что пагинатор выводит только окно номеров страниц."
+    )
+    # Окно из 11 номеров и ссылки «Первая», «<<», «>>», «Последняя».
+    assert content.count('class="page-item') == 15
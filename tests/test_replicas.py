@@ -0,0 +1,83 @@
+import pytest
+from django.db import connections
+
+from blog.models import Comment, Post
+from blog.routers import ReplicaRouter, use_replica
+from conftest import page_urls
+
+# Реплика читается из другого соединения, поэтому данные на основной базе
+# должны быть закоммичены.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+REPLICA = "replica"
+
+
+@pytest.fixture
+def replicate(tmp_path, settings):
+    """Подключает файловую реплику; вызов копирует в неё основную базу."""
+    connections.databases[REPLICA] = {
+        **connections["default"].settings_dict,
+        "NAME": str(tmp_path / "replica.sqlite3"),
+    }
+    settings.DATABASE_REPLICAS = [REPLICA]
+
+    def copy():
+        for alias in ("default", REPLICA):
+            connections[alias].ensure_connection()
+        connections["default"].connection.backup(
+            connections[REPLICA].connection
+        )
+
+    yield copy
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.databases[REPLICA]
+
+
+@use_replica
+def read_alias():
+    return ReplicaRouter().db_for_read(Post)
+
+
+def test_router(settings):
+    settings.DATABASE_REPLICAS = []
+    assert read_alias() is None
+    settings.DATABASE_REPLICAS = [REPLICA]
+    assert read_alias() == REPLICA
+    assert ReplicaRouter().db_for_read(Post) is None, (
+        "Убедитесь, что с реплики читают только представления "
+        "с use_replica."
+    )
+    assert ReplicaRouter().db_for_write(Post) == "default"
+
+
+def test_public_pages_read_replica(client, post, replicate):
+    replicate()
+    Post.objects.filter(pk=post.pk).update(title="Только на основной базе")
+    for url in page_urls(post):
+        content = client.get(url).content.decode()
+        assert post.title in content, (
+            f"Убедитесь, что страница {url} читается с реплики."
+        )
+        assert "Только на основной базе" not in content
+
+
+def test_write_makes_reads_sticky(
+        client, user_client, post_with_published_location, replicate
+):
+    post = post_with_published_location
+    replicate()
+    url = f"/posts/{post.id}/"
+    response = user_client.post(
+        f"{url}comments/", {"text": "Свежий комментарий"}
+    )
+    assert Comment.objects.filter(post=post).exists()
+    assert response.cookies.get("primary_until"), (
+        "Убедитесь, что после записи ставится cookie привязки "
+        "к основной базе."
+    )
+    assert "Свежий комментарий" in user_client.get(url).content.decode(), (
+        "Убедитесь, что автор сразу видит свой комментарий."
+    )
+    assert "Свежий комментарий" not in client.get(url).content.decode()
+    assert not client.get(url).cookies.get("primary_until")
@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog.models import Post
+from blog.scheduling import (
+    LAST_CHECK_KEY,
+    NEXT_PUBLICATION_KEY,
+    cap_timeout,
+    publish_due,
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def no_publication_timer(settings):
+    settings.PUBLICATION_TIMER = False
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=30),
+        title="Отложенная публикация",
+    )
+
+
+def test_cache_timeout_is_capped_by_next_publication(scheduled_post):
+    assert cap_timeout(600) <= 30
+    scheduled_post.is_published = False
+    scheduled_post.save()
+    assert cap_timeout(600) == 600
+
+
+def test_loading_posts_keeps_next_publication(scheduled_post):
+    cap_timeout(600)
+    list(Post.objects.all())
+    assert cache.get(NEXT_PUBLICATION_KEY) is not None, (
+        "Убедитесь, что загрузка постов не сбрасывает ближайшую публикацию."
+    )
+
+
+def test_publish_scheduled_requires_shared_cache(settings):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+    with pytest.raises(CommandError):
+        call_command("publish_scheduled")
+
+
+def test_publish_due_refreshes_and_warms_feeds(
+        client, scheduled_post, django_assert_num_queries
+):
+    url = f"/category/{scheduled_post.category.slug}/"
+    assert "Отложенная публикация" not in client.get(url).content.decode()
+    cache.set(
+        LAST_CHECK_KEY, timezone.now() - timedelta(minutes=1), timeout=None
+    )
+
+    # Время публикации наступило: событий в базе при этом не происходит.
+    Post.objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    assert publish_due() == [scheduled_post]
+
+    for url in ("/", url, f"/profile/{scheduled_post.author.username}/"):
+        with django_assert_num_queries(0):
+            content = client.get(url).content.decode()
+        assert "Отложенная публикация" in content
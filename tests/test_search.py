@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category):
+    def blend(title, text, **kwargs):
+        params = {
+            "author": user,
+            "category": published_category,
+            "is_published": True,
+            "pub_date": timezone.now() - timedelta(days=1),
+        }
+        params.update(kwargs)
+        return mixer.blend("blog.Post", title=title, text=text, **params)
+
+    return {
+        "title": blend("Велосипедный маршрут", "Прогулка вдоль реки"),
+        "text": blend("Выходные", "Взяли велосипеды и поехали за город"),
+        "other": blend("Рецепт пирога", "Мука, яйца и яблоки"),
+        "hidden": blend("Велосипед в ремонте", "Черновик", is_published=False),
+        "future": blend(
+            "Велосипедный сезон", "Скоро",
+            pub_date=timezone.now() + timedelta(days=1),
+        ),
+    }
+
+
+def found_ids(client, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == 200
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_search_ranks_title_matches_first(client, searchable_posts):
+    assert found_ids(client, "велосипед") == [
+        searchable_posts["title"].id,
+        searchable_posts["text"].id,
+    ], (
+        "Убедитесь, что поиск находит только опубликованные посты по"
+        " префиксу слова и ставит совпадения в заголовке выше."
+    )
+
+
+def test_search_index_follows_edits(client, searchable_posts):
+    post = searchable_posts["other"]
+    post.title = "Пирог для велосипедистов"
+    post.save()
+    assert post.id in found_ids(client, "велосипедист")
+
+    searchable_posts["title"].delete()
+    assert searchable_posts["title"].id not in found_ids(client, "маршрут")
+
+
+def test_search_handles_fts_syntax(client, searchable_posts):
+    assert found_ids(client, '"AND OR * (') == []
+    assert found_ids(client, "") == []
+
+
+def test_admin_search_uses_full_text_index(admin_client, searchable_posts):
+    response = admin_client.get("/admin/blog/post/", {"q": "пирог"})
+    assert response.status_code == 200
+    assert list(response.context["cl"].result_list) == [
+        searchable_posts["other"]
+    ]
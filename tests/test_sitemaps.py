@@ -0,0 +1,130 @@
+import os
+from datetime import timedelta
+from xml.etree import ElementTree
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+
+
+@pytest.fixture(autouse=True)
+def sitemap_settings(settings, tmp_path):
+    settings.SITEMAP_ROOT = tmp_path / "sitemaps"
+    settings.SITEMAP_CHUNK_SIZE = 2
+
+
+def read(response):
+    content = b"".join(
+        response.streaming_content if response.streaming
+        else [response.content]
+    )
+    return ElementTree.fromstring(content)
+
+
+def locations(client):
+    index = read(client.get("/sitemap.xml"))
+    urls = []
+    for loc in index.findall("sm:sitemap/sm:loc", NS):
+        chunk = read(client.get(loc.text.replace("http://testserver", "")))
+        entries = chunk.findall("sm:url", NS)
+        assert len(entries) <= 2, (
+            "Убедитесь, что в части карты сайта не больше "
+            "`SITEMAP_CHUNK_SIZE` адресов."
+        )
+        urls.extend(
+            (entry.find("sm:loc", NS).text,
+             entry.find("sm:lastmod", NS).text)
+            for entry in entries
+        )
+    return dict(urls)
+
+
+def test_sitemap_lists_visible_objects(
+        client,
+        many_posts_with_published_locations,
+        unpublished_posts_with_published_locations,
+):
+    urls = locations(client)
+    for post in many_posts_with_published_locations:
+        assert f"http://testserver/posts/{post.id}/" in urls
+        assert f"http://testserver/category/{post.category.slug}/" in urls
+        assert f"http://testserver/profile/{post.author.username}/" in urls
+    for post in unpublished_posts_with_published_locations:
+        assert f"http://testserver/posts/{post.id}/" not in urls, (
+            "Убедитесь, что в карту сайта не попадают скрытые публикации."
+        )
+
+
+def test_chunk_cached_on_disk_and_rebuilt(
+        client, settings, mixer, post_with_published_location
+):
+    settings.SITEMAP_KEEP_STALE = 0
+    post = post_with_published_location
+    url = f"http://testserver/posts/{post.id}/"
+    assert locations(client)[url].startswith(
+        post.pub_date.isoformat(timespec="seconds")[:10]
+    )
+    files = set(os.listdir(settings.SITEMAP_ROOT))
+    assert files, "Убедитесь, что части карты сайта сохраняются на диск."
+    locations(client)
+    assert set(os.listdir(settings.SITEMAP_ROOT)) == files
+
+    comment = mixer.blend(Comment, post=post)
+    Comment.objects.filter(pk=comment.pk).update(
+        created_at=timezone.now() + timedelta(days=400)
+    )
+    lastmod = locations(client)[url]
+    assert lastmod.startswith(str(timezone.now().year + 1)), (
+        "Убедитесь, что lastmod учитывает время последнего комментария."
+    )
+    assert len(os.listdir(settings.SITEMAP_ROOT)) == len(files), (
+        "Убедитесь, что устаревшие части карты сайта удаляются."
+    )
+
+
+def test_recent_stale_chunk_kept(
+        client, settings, mixer, post_with_published_location
+):
+    locations(client)
+    files = set(os.listdir(settings.SITEMAP_ROOT))
+    mixer.blend(Comment, post=post_with_published_location)
+    locations(client)
+    assert files < set(os.listdir(settings.SITEMAP_ROOT)), (
+        "Убедитесь, что недавно заменённые части карты сайта остаются "
+        "на диске, пока их могут отдавать другие процессы."
+    )
+    assert not [
+        name for name in os.listdir(settings.SITEMAP_ROOT)
+        if not name.endswith(".xml")
+    ], "Убедитесь, что временные файлы частей удаляются."
+
+
+def test_warm_sitemap_skips_database(
+        client, settings, many_posts_with_published_locations
+):
+    locations(client)
+    with CaptureQueriesContext(connection) as queries:
+        urls = locations(client)
+    assert urls
+    assert not queries.captured_queries, (
+        "Убедитесь, что статистика частей карты сайта кешируется и "
+        "повторные запросы не обращаются к базе."
+    )
+    os.remove(os.path.join(
+        settings.SITEMAP_ROOT, sorted(os.listdir(settings.SITEMAP_ROOT))[0]
+    ))
+    assert locations(client) == urls, (
+        "Убедитесь, что удалённая с диска часть собирается заново."
+    )
+
+
+def test_missing_chunk(client):
+    assert client.get("/sitemap-posts-100.xml").status_code == 404
+    assert client.get("/sitemap-users-0.xml").status_code == 404
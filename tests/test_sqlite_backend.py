@@ -0,0 +1,151 @@
+import threading
+
+import pytest
+from django.db import OperationalError, connection
+from django.test import override_settings
+
+from blogicum.sqlite_backend.base import DatabaseWrapper
+
+READERS = 4
+WRITES = 30
+
+
+@pytest.fixture
+def database(tmp_path, django_db_blocker):
+    """Фабрика соединений с отдельной файловой базой SQLite."""
+    settings_dict = {**connection.settings_dict, "NAME": str(tmp_path / "db")}
+
+    def connect():
+        wrapper = DatabaseWrapper(settings_dict)
+        wrapper.ensure_connection()
+        return wrapper
+
+    with django_db_blocker.unblock():
+        setup = connect()
+        with setup.cursor() as cursor:
+            cursor.execute(
+                "CREATE TABLE item (id INTEGER PRIMARY KEY, text TEXT)"
+            )
+            cursor.execute("INSERT INTO item (text) VALUES ('первая')")
+        setup.close()
+        yield connect
+
+
+def pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_pragmas_applied(database):
+    wrapper = database()
+    assert pragma(wrapper, "journal_mode") == "wal", (
+        "Убедитесь, что соединения с SQLite работают в режиме WAL."
+    )
+    assert pragma(wrapper, "synchronous") == 1
+    assert pragma(wrapper, "busy_timeout") == 5000
+    assert pragma(wrapper, "cache_size") == -20000
+    wrapper.close()
+
+
+def hold_snapshot_and_write(database):
+    reader, writer = database(), database()
+    with reader.cursor() as read, writer.cursor() as write:
+        read.execute("BEGIN")
+        read.execute("SELECT count(*) FROM item")
+        try:
+            write.execute("BEGIN")
+            write.execute("INSERT INTO item (text) VALUES ('вторая')")
+            write.execute("COMMIT")
+        finally:
+            read.execute("SELECT count(*) FROM item")
+            seen = read.fetchone()[0]
+            read.execute("COMMIT")
+    reader.close()
+    writer.close()
+    return seen
+
+
+def test_writer_not_blocked_by_open_read(database):
+    assert hold_snapshot_and_write(database) == 1, (
+        "Убедитесь, что читатель видит снимок базы на начало транзакции."
+    )
+
+
+@override_settings(
+    SQLITE_PRAGMAS={"journal_mode": "delete", "busy_timeout": 50}
+)
+def test_rollback_journal_locks(database):
+    # Без WAL запись ждёт, пока читатель не закончит, и сдаётся.
+    with pytest.raises(OperationalError, match="locked"):
+        hold_snapshot_and_write(database)
+
+
+class Stress:
+    """Один писатель и несколько читателей на одной базе."""
+
+    def __init__(self, database):
+        self.database = database
+        self.errors = []
+        self.reads_during_write = 0
+        self.writing = threading.Event()
+        self.done = threading.Event()
+
+    def write(self, cursor):
+        for number in range(WRITES):
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(
+                "INSERT INTO item (text) VALUES (%s)", [str(number)]
+            )
+            self.writing.set()
+            # Транзакция открыта, пока читатели успевают прочитать.
+            self.done.wait(0.005)
+            self.writing.clear()
+            cursor.execute("COMMIT")
+        self.done.set()
+
+    def read(self, cursor):
+        while not self.done.is_set():
+            during_write = self.writing.is_set()
+            cursor.execute("SELECT count(*) FROM item")
+            cursor.fetchone()
+            if during_write and self.writing.is_set():
+                self.reads_during_write += 1
+
+    def worker(self, action):
+        wrapper = self.database()
+        try:
+            with wrapper.cursor() as cursor:
+                action(cursor)
+        except Exception as error:
+            self.errors.append(error)
+            self.done.set()
+        finally:
+            wrapper.close()
+
+    def run(self):
+        threads = [
+            threading.Thread(target=self.worker, args=(action,))
+            for action in [self.write] + [self.read] * READERS
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+
+
+def test_readers_not_blocked_by_writer(database):
+    stress = Stress(database)
+    stress.run()
+    assert not stress.errors, (
+        "Убедитесь, что параллельные чтение и запись не падают: "
+        f"{stress.errors}"
+    )
+    assert stress.reads_during_write, (
+        "Убедитесь, что читатели не ждут завершения транзакции записи."
+    )
+    checker = database()
+    with checker.cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM item")
+        assert cursor.fetchone()[0] == WRITES + 1
+    checker.close()
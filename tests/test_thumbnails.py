@@ -0,0 +1,82 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.files.images import ImageFile
+from PIL import Image
+
+from blog.tasks import generate_post_thumbnails
+from blog.thumbnails import thumbnail_name
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(name, size=(1600, 900)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color=(73, 109, 137)).save(buffer, format="JPEG")
+    return ImageFile(buffer, name=name)
+
+
+def thumbnails_of(image_file, settings):
+    return [
+        thumbnail_name(image_file.name, size_name)
+        for size_name in settings.THUMBNAIL_SIZES
+    ]
+
+
+def test_thumbnails_are_generated_on_upload(post, settings):
+    post.image = make_image("big.jpg")
+    post.save()
+    call_command("runworker", "--once", stdout=StringIO())
+    storage = post.image.storage
+    for size_name, width in settings.THUMBNAIL_SIZES.items():
+        name = thumbnail_name(post.image.name, size_name)
+        assert storage.exists(name), (
+            "Убедитесь, что при загрузке изображения создаются его копии."
+        )
+        with storage.open(name) as thumbnail:
+            assert Image.open(thumbnail).width == width
+    post.refresh_from_db()
+    assert post.thumbnails == settings.THUMBNAIL_SIZES, (
+        "Убедитесь, что ширины копий сохраняются в посте."
+    )
+
+
+def test_render_does_not_generate_thumbnails(client, post, settings):
+    response = client.get(f"/posts/{post.id}/")
+    assert "srcset=" not in response.content.decode(), (
+        "Убедитесь, что srcset выводится только для готовых копий."
+    )
+    assert not any(
+        post.image.storage.exists(name)
+        for name in thumbnails_of(post.image, settings)
+    ), "Убедитесь, что копии не создаются при рендеринге страницы."
+
+
+def test_templates_emit_srcset(client, post):
+    generate_post_thumbnails(post.pk)
+    for url in ("/", f"/posts/{post.id}/"):
+        content = client.get(url).content.decode()
+        assert "srcset=" in content
+        assert thumbnail_name(post.image.name, "card") in content
+
+
+def test_thumbnails_are_removed_with_image(post, settings):
+    settings.JOBS_EAGER = True
+    post.image = make_image("original.jpg")
+    post.save()
+    storage = post.image.storage
+    old_thumbnails = thumbnails_of(post.image, settings)
+    assert all(storage.exists(name) for name in old_thumbnails)
+
+    post.image = make_image("replacement.jpg")
+    post.save()
+    assert not any(storage.exists(name) for name in old_thumbnails), (
+        "Убедитесь, что копии старого изображения удаляются при замене."
+    )
+
+    new_thumbnails = thumbnails_of(post.image, settings)
+    post.delete()
+    assert not any(storage.exists(name) for name in new_thumbnails), (
+        "Убедитесь, что копии изображения удаляются вместе с постом."
+    )